@@ -6,6 +6,7 @@ from datetime import datetime
 import subprocess
 import time
 from config import INTEREST_CONFIG
+from keyword_matcher import get_matcher
 
 # Category mapping
 CATEGORY_MAP = {
@@ -49,6 +50,9 @@ def debug_database(conn):
         cursor.execute("SELECT COUNT(*) FROM discovered_sources WHERE is_active = 1")
         debug_info["stats"]["active_sources"] = cursor.fetchone()[0]
 
+        cursor.execute("SELECT COUNT(*) FROM posts WHERE canonical_id IS NOT NULL")
+        debug_info["stats"]["duplicate_posts"] = cursor.fetchone()[0]
+
         cursor.execute("SELECT COUNT(DISTINCT source) FROM posts")
         debug_info["stats"]["unique_sources"] = cursor.fetchone()[0]
 
@@ -118,8 +122,7 @@ def record_feedback(post_id, feedback_type, original_score, conn):
         content_features = {
             "word_count": len(content.split()) if content else 0,
             "title_length": len(post_data[0].split()) if post_data[0] else 0,
-            "has_technical_terms": any(term in content.lower() for term in 
-                ["algorithm", "api", "framework", "system", "analysis", "research"]) if content else False,
+            "has_technical_terms": get_matcher().counts(content)["technical"] > 0,
             "source": source,
             "topic": topic
         }
@@ -275,6 +278,7 @@ def main():
                        p.source, p.topic, p.user_feedback 
                 FROM posts p
                 WHERE p.is_high_value = 1
+                AND p.canonical_id IS NULL
             """
             params = []
 
@@ -352,6 +356,7 @@ def main():
                        p.source, p.topic, p.user_feedback, p.is_high_value
                 FROM posts p
                 WHERE p.is_high_value = 0
+                AND p.canonical_id IS NULL
             """
             params = []
 
@@ -0,0 +1,585 @@
+# benchmarks.py
+import argparse
+import glob
+import logging
+import os
+import time
+
+logging.basicConfig(
+    level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def load_pages(directory):
+    """Saved HTML pages as (name, html) pairs"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.htm*"))):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def report(label, seconds, count, unit):
+    rate = count / seconds if seconds else float("inf")
+    per_item_ms = seconds / count * 1000 if count else 0.0
+    print(f"{label:<36} {seconds:8.3f}s  {rate:10.1f} {unit}/sec  {per_item_ms:8.2f} ms/{unit[:-1]}")
+
+
+def bench_parse(args):
+    """Parse-once HtmlDocument per backend vs the old three html.parser passes per page"""
+    from bs4 import BeautifulSoup
+    from html_document import HtmlDocument, available_backends
+
+    pages = load_pages(args.pages)
+    if not pages:
+        print(f"No .html files found in {args.pages}")
+        return
+    print(f"{len(pages)} pages, {sum(len(html) for _, html in pages) / 1e6:.1f} MB, "
+          f"{args.repeat} repeats")
+
+    # Baseline: listing soup, discovery soup and article soup parsed separately
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for name, html in pages:
+            BeautifulSoup(html, "html.parser").find_all("div")
+            HtmlDocument(html, "https://example.com/", backend="html.parser").links()
+            HtmlDocument(html, "https://example.com/", backend="html.parser").article_text()
+    report("html.parser x3 (before)", time.perf_counter() - started,
+           len(pages) * args.repeat, "pages")
+
+    for backend in available_backends():
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for name, html in pages:
+                doc = HtmlDocument(html, "https://example.com/", backend=backend)
+                doc.links()
+                doc.article_text()
+                if backend != "selectolax":
+                    doc.soup.find_all("div")
+        report(f"{backend} parse-once", time.perf_counter() - started,
+               len(pages) * args.repeat, "pages")
+
+
+def bench_bloom(args):
+    """Seen-URL Bloom filter memory and false-positive rate at a given table size"""
+    import sqlite3
+    import sys
+    from bloom_filter import BloomFilter, DEFAULT_CAPACITY
+
+    size = args.urls
+    if size is None:
+        try:
+            conn = sqlite3.connect(args.database)
+            size = conn.execute("SELECT COUNT(*) FROM discovered_sources").fetchone()[0]
+            conn.close()
+        except sqlite3.Error:
+            size = 0
+        size = size or 100_000
+    capacity = max(DEFAULT_CAPACITY, size * 2)
+
+    urls = [f"https://site{i % 5000}.example.com/posts/{i}" for i in range(size)]
+    started = time.perf_counter()
+    bloom = BloomFilter(capacity)
+    for url in urls:
+        bloom.add(url)
+    report("build", time.perf_counter() - started, size, "urls")
+
+    probes = [f"https://other{i % 5000}.example.org/p/{i}" for i in range(args.probes)]
+    started = time.perf_counter()
+    false_positives = sum(1 for url in probes if url in bloom)
+    report("lookup (unseen urls)", time.perf_counter() - started, len(probes), "urls")
+
+    url_set = set(urls)
+    set_bytes = sys.getsizeof(url_set) + sum(sys.getsizeof(url) for url in urls)
+    print(f"{size} URLs, capacity {capacity}, {bloom.num_hashes} hashes")
+    print(f"Bloom filter memory: {bloom.memory_bytes / 1e6:.2f} MB "
+          f"(Python set of the same URLs: {set_bytes / 1e6:.2f} MB)")
+    print(f"False-positive rate: measured {false_positives / len(probes):.2e}, "
+          f"expected {bloom.expected_error_rate():.2e} (design {bloom.error_rate:.0e} at capacity)")
+
+
+def synthetic_posts(count, words=300, seed=0, prefix="bench"):
+    """Posts with random word content, distinct enough not to be near-duplicates"""
+    import datetime
+    import random
+
+    rng = random.Random(seed)
+    vocab = [f"word{i}" for i in range(5000)]
+    return [
+        {
+            "id": f"{prefix}-{i}",
+            "title": f"Synthetic post {i}",
+            "url": f"https://example.com/{prefix}/{i}",
+            "content": " ".join(rng.choice(vocab) for _ in range(words)),
+            "source": "bench",
+            "created_at": datetime.datetime.utcnow(),
+        }
+        for i in range(count)
+    ]
+
+
+def scratch_database():
+    """Initialize a throwaway database.db in a temp dir and chdir into it"""
+    import tempfile
+    import db_init
+
+    os.chdir(tempfile.mkdtemp(prefix="vf-bench-"))
+    db_init.initialize_database()
+
+
+def bench_writer(args):
+    """Per-post commits vs the batched PostWriter, and per-row vs batch existence checks"""
+    import sqlite3
+    import crawler
+
+    scratch_database()
+    posts = synthetic_posts(args.posts * 2)
+    before, after = posts[:args.posts], posts[args.posts:]
+
+    conn = sqlite3.connect(crawler.DATABASE)  # old connection settings
+    started = time.perf_counter()
+    for post in before:
+        crawler.save_post(conn, post)
+    report("save_post, commit per post", time.perf_counter() - started, len(before), "posts")
+    conn.close()
+
+    conn = crawler.get_db_connection()
+    started = time.perf_counter()
+    with crawler.PostWriter(conn, batch_size=args.batch_size) as writer:
+        for post in after:
+            writer.add(post)
+    report(f"PostWriter, batches of {args.batch_size}", time.perf_counter() - started,
+           len(after), "posts")
+
+    ids = [post["id"] for post in posts] + [f"missing-{i}" for i in range(len(posts))]
+    started = time.perf_counter()
+    for post_id in ids:
+        crawler.post_exists(conn, post_id)
+    report("post_exists per id", time.perf_counter() - started, len(ids), "ids")
+    started = time.perf_counter()
+    crawler.existing_post_ids(conn, ids)
+    report("existing_post_ids batch", time.perf_counter() - started, len(ids), "ids")
+    conn.close()
+
+
+def bench_extract(args):
+    """Article extraction throughput in-process vs a process pool of 1..N workers"""
+    from concurrent.futures import ProcessPoolExecutor
+    import crawler
+
+    pages = load_pages(args.pages) * args.repeat
+    urls = [f"https://example.com/{name}" for name, _ in pages]
+    htmls = [html for _, html in pages]
+    print(f"{len(pages)} articles, {os.cpu_count()} cores")
+
+    started = time.perf_counter()
+    for url, html in zip(urls, htmls):
+        crawler.parse_article(url, html)
+    report("in-process parse_article", time.perf_counter() - started, len(pages), "articles")
+
+    counts = args.workers or sorted({1, 2, 4, os.cpu_count() or 1})
+    for workers in counts:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pool.submit(int).result()  # exclude worker start-up from the timing
+            started = time.perf_counter()
+            list(pool.map(crawler.parse_article, urls, htmls, chunksize=4))
+            elapsed = time.perf_counter() - started
+        report(f"process pool, {workers} workers", elapsed, len(pages), "articles")
+
+
+def bench_embed(args):
+    """Per-post encode + cos_sim loop vs one batched encode and a single matrix product"""
+    import numpy as np
+    from sentence_transformers import SentenceTransformer, util
+    from config import INTEREST_CONFIG
+    import scorer
+
+    model = SentenceTransformer("all-MiniLM-L6-v2")
+    categories = list(INTEREST_CONFIG["categories"].values())
+    interest_embeddings = model.encode(
+        [config["name"] + ": " + ", ".join(config["keywords"]) for config in categories],
+        normalize_embeddings=True,
+    )
+    weights = [config["weight"] for config in categories]
+    texts = [post["content"] for post in synthetic_posts(args.posts, words=args.words)]
+
+    started = time.perf_counter()
+    loop_topics = []
+    for text in texts:
+        embedding = model.encode(text, normalize_embeddings=True)
+        similarities = util.cos_sim(embedding, interest_embeddings)[0].numpy()
+        loop_topics.append(int(np.argmax(similarities * weights)))
+    report("per-post encode + cos_sim", time.perf_counter() - started, len(texts), "posts")
+
+    started = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=args.batch_size, normalize_embeddings=True)
+    batch_topics, _ = scorer.match_interests(embeddings, interest_embeddings, weights)
+    report(f"batched encode, batch_size={args.batch_size}", time.perf_counter() - started,
+           len(texts), "posts")
+    agreement = np.mean(np.asarray(loop_topics) == batch_topics)
+    print(f"Topic agreement between the two paths: {agreement:.2%}")
+
+
+def bench_prep(args):
+    """Text handed to the tokenizer and encode time, raw content vs prepare_chunks"""
+    import numpy as np
+    import embedding_store
+
+    posts = synthetic_posts(args.posts, words=args.words)
+    texts = [post["content"] for post in posts]  # What was embedded before preparation
+    started = time.perf_counter()
+    chunk_lists = [
+        embedding_store.prepare_chunks(post["title"], post["content"], args.sampled_chunks)
+        for post in posts
+    ]
+    report(f"prepare_chunks, {args.sampled_chunks} sampled", time.perf_counter() - started,
+           len(texts), "posts")
+    prepared_chars = sum(len(chunk) for chunks in chunk_lists for chunk in chunks)
+    print(f"Characters to tokenize: {sum(map(len, texts)):,} raw, {prepared_chars:,} prepared")
+    if not args.encode:
+        return
+
+    model = embedding_store.get_model()
+    started = time.perf_counter()
+    raw = model.encode(texts, batch_size=args.batch_size, normalize_embeddings=True)
+    report("encode raw text", time.perf_counter() - started, len(texts), "posts")
+    started = time.perf_counter()
+    flat = model.encode([chunk for chunks in chunk_lists for chunk in chunks],
+                        batch_size=args.batch_size, normalize_embeddings=True)
+    offsets = np.cumsum([0] + [len(chunks) for chunks in chunk_lists])
+    prepared = np.vstack([embedding_store.mean_vector(flat[start:end])
+                          for start, end in zip(offsets[:-1], offsets[1:])])
+    report("encode prepared chunks", time.perf_counter() - started, len(texts), "posts")
+    print(f"Mean cosine, raw vs prepared: {np.mean(np.sum(raw * prepared, axis=1)):.4f}")
+
+
+def bench_backends(args):
+    """Embedding backends on a fixed corpus: throughput, p50/p99 latency, cosine agreement with torch"""
+    import sqlite3
+    import numpy as np
+    from config import INTEREST_CONFIG
+    import embedding_store
+    import scorer
+
+    if args.database:
+        conn = sqlite3.connect(args.database)
+        rows = conn.execute(
+            "SELECT title, content FROM posts WHERE content IS NOT NULL ORDER BY id LIMIT ?",
+            (args.posts,),
+        ).fetchall()
+        conn.close()
+    else:
+        rows = [(post["title"], post["content"])
+                for post in synthetic_posts(args.posts, words=args.words)]
+    # The same model input the scorer produces
+    texts = [embedding_store.prepare_chunks(title, content)[0] for title, content in rows]
+    categories = list(INTEREST_CONFIG["categories"].values())
+    interest_texts = [config["name"] + ": " + ", ".join(config["keywords"]) for config in categories]
+    weights = [config["weight"] for config in categories]
+    print(f"{len(texts)} texts, {args.latency_runs} single-text latency runs")
+
+    results = {}
+    for name in ["torch"] + [name for name in args.backends if name != "torch"]:
+        model = embedding_store.get_model(name)
+        model.encode(texts[:args.batch_size], batch_size=args.batch_size, normalize_embeddings=True)
+
+        started = time.perf_counter()
+        embeddings = np.asarray(model.encode(texts, batch_size=args.batch_size,
+                                             normalize_embeddings=True), dtype=np.float32)
+        report(f"{name} throughput", time.perf_counter() - started, len(texts), "texts")
+
+        latencies = []
+        for i in range(args.latency_runs):
+            started = time.perf_counter()
+            model.encode([texts[i % len(texts)]], normalize_embeddings=True)
+            latencies.append((time.perf_counter() - started) * 1000)
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"{name} latency: p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+
+        interest_embeddings = np.asarray(model.encode(interest_texts, normalize_embeddings=True),
+                                         dtype=np.float32)
+        topics, _ = scorer.match_interests(embeddings, interest_embeddings, weights)
+        results[name] = (embeddings, topics)
+
+    reference, reference_topics = results["torch"]
+    for name, (embeddings, topics) in results.items():
+        if name == "torch":
+            continue
+        cosines = np.sum(reference * embeddings, axis=1)
+        print(f"{name} vs torch: cosine mean {cosines.mean():.5f}, min {cosines.min():.5f}, "
+              f"topic agreement {np.mean(topics == reference_topics):.2%}")
+
+
+def bench_score(args):
+    """Per-post scoring cost by stage, with the per-post SQL and per-term scans it replaced"""
+    import keyword_matcher
+    import scorer
+
+    scratch_database()
+    posts = synthetic_posts(args.posts, words=args.words)
+    scorer_ = scorer.ValueScorer()
+    scorer_.conn.executemany(
+        "INSERT INTO source_penalties (source, penalty_score) VALUES (?, ?)",
+        [(f"source-{i}", 0.5 + i / 20) for i in range(10)],
+    )
+    scorer_.conn.commit()
+
+    started = time.perf_counter()
+    scorer_.context = scorer_.build_scoring_context()
+    report("build_scoring_context (once per run)", time.perf_counter() - started, 1, "runs")
+
+    started = time.perf_counter()
+    features = [
+        scorer_.extract_content_features(post["content"], post["title"], post["source"])
+        for post in posts
+    ]
+    report("extract_content_features", time.perf_counter() - started, len(posts), "posts")
+
+    started = time.perf_counter()
+    for feature in features:
+        scorer_.calculate_value_score(feature, 0.5)
+    report("calculate_value_score", time.perf_counter() - started, len(posts), "posts")
+
+    started = time.perf_counter()
+    for post, feature in zip(posts, features):
+        scorer_.calculate_novelty_score(feature, post["content"])
+    report("calculate_novelty_score", time.perf_counter() - started, len(posts), "posts")
+
+    cursor = scorer_.conn.cursor()
+    started = time.perf_counter()
+    for i in range(len(posts)):
+        cursor.execute(
+            "SELECT penalty_score FROM source_penalties WHERE source = ?", (f"source-{i % 10}",)
+        )
+        cursor.fetchone()
+    report("old: SQL source lookup per post", time.perf_counter() - started, len(posts), "posts")
+
+    term_lists = (
+        keyword_matcher.QUALITY_INDICATORS,
+        keyword_matcher.NOVELTY_KEYWORDS,
+        keyword_matcher.JUNK_INDICATORS,
+    )
+    started = time.perf_counter()
+    for post in posts:
+        text = (post["title"] + " " + post["content"]).lower()
+        for terms in term_lists:
+            sum(1 for term in terms if term in text)
+    report("old: one scan per indicator term", time.perf_counter() - started, len(posts), "posts")
+    scorer_.conn.close()
+
+
+def bench_keywords(args):
+    """KeywordMatcher's find scan and trie paths vs one substring scan per term, as the lists grow"""
+    import keyword_matcher
+
+    # Overlapping terms across and within lists must all count, on both paths
+    overlapping = {"a": ["new", "deep"], "b": ["new york", "deep work"], "c": ["york", "work"]}
+    for scan_max_terms in (len(overlapping) * 2, 0):
+        matcher = keyword_matcher.KeywordMatcher(overlapping, scan_max_terms=scan_max_terms)
+        counts = matcher.counts("The New York Times on deep work; renewal, newyork")
+        passed = counts == {"a": 2, "b": 2, "c": 2}
+        print(f"{'ok' if passed else 'FAILED':<7} overlapping terms, {'scan' if matcher.scan else 'trie'} path: {counts}")
+        if not passed:
+            raise SystemExit(1)
+
+    posts = synthetic_posts(args.posts, words=args.words)
+    texts = [(post["title"] + " " + post["content"]).lower() for post in posts]
+    for size in args.terms:
+        # Three lists, like the scorer's, drawing on the synthetic vocabulary; four-digit
+        # words only, so no term is a prefix of other words as "word1" is of "word1234"
+        term_lists = {
+            name: [f"word{1000 + (i * 3 + offset) % 4000}" for i in range(size // 3)]
+            for offset, name in enumerate(["quality", "novelty", "junk"])
+        }
+        started = time.perf_counter()
+        matchers = {
+            "scan": keyword_matcher.KeywordMatcher(term_lists, scan_max_terms=size),
+            "trie": keyword_matcher.KeywordMatcher(term_lists, scan_max_terms=0),
+        }
+        report(f"compile {size} terms", time.perf_counter() - started, 1, "runs")
+
+        results = {}
+        for path, matcher in matchers.items():
+            started = time.perf_counter()
+            results[path] = [matcher.counts(text) for text in texts]
+            report(f"{path} path, {size} terms", time.perf_counter() - started, len(texts), "posts")
+        if results["scan"] != results["trie"]:
+            print(f"FAILED scan and trie paths disagree at {size} terms")
+            raise SystemExit(1)
+
+        started = time.perf_counter()
+        for text in texts:
+            for terms in term_lists.values():
+                sum(1 for term in terms if term in text)
+        report(f"per-term substring scans, {size} terms", time.perf_counter() - started,
+               len(texts), "posts")
+
+
+def bench_replay(args):
+    """Record a locally served page, then check streamed and plain replays return it intact"""
+    import http.server
+    import tempfile
+    import threading
+    import requests
+    import http_fixtures
+    from crawler import read_bounded
+
+    body = ("<html><body>" + "<p>replayed paragraph</p>" * args.paragraphs + "</body></html>").encode()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/page"
+    root = tempfile.mkdtemp(prefix="vf-fixtures-")
+    try:
+        http_fixtures.configure("record", root)
+        recorded = read_bounded(http_fixtures.install(requests.Session()).get(url, stream=True), url)
+
+        http_fixtures.configure("replay", root)
+        session = http_fixtures.install(requests.Session())
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            streamed = read_bounded(session.get(url, stream=True), url)
+        report("streamed replay", time.perf_counter() - started, args.repeat, "pages")
+        plain = session.get(url)
+        try:
+            session.get(url + "/missing")
+            missing_raises = False
+        except requests.exceptions.ConnectionError:
+            missing_raises = True
+    finally:
+        http_fixtures.configure("live")
+        server.shutdown()
+
+    checks = {
+        "recorded body intact": recorded.content == body,
+        "streamed replay body": streamed.content == body,
+        "plain replay body": plain.content == body,
+        "status and content type": (streamed.status_code, streamed.headers.get("Content-Type"))
+        == (200, "text/html; charset=utf-8"),
+        "unrecorded URL raises ConnectionError": missing_raises,
+    }
+    for name, passed in checks.items():
+        print(f"{'ok' if passed else 'FAILED':<7} {name}")
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+def bench_crawl(args):
+    """A full crawl replayed from recorded fixtures, so runs are comparable offline"""
+    import shutil
+    import sqlite3
+    import tempfile
+    import http_fixtures
+
+    # Configure replay before crawler builds its session; paths must survive the chdir
+    http_fixtures.configure("replay", os.path.abspath(args.fixtures))
+    database = os.path.abspath(args.database)
+    os.chdir(tempfile.mkdtemp(prefix="vf-bench-"))
+    shutil.copy(database, "database.db")
+    import crawler
+
+    crawler.RATE_LIMITER.enabled = False
+    fixtures = len(glob.glob(os.path.join(http_fixtures.fixture_dir(), "*.json")))
+
+    conn = sqlite3.connect(crawler.DATABASE)
+    before = conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+    started = time.perf_counter()
+    crawler.scrape_active_sources(concurrent=args.concurrent)
+    elapsed = time.perf_counter() - started
+    saved = conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0] - before
+    conn.close()
+
+    mode = "async engine" if args.concurrent else "sequential"
+    report(f"Replayed crawl, {mode}, {fixtures} fixtures", elapsed, saved, "posts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Value Finder microbenchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    parse = subparsers.add_parser("parse", help=bench_parse.__doc__)
+    parse.add_argument("pages", help="directory of saved .html pages")
+    parse.add_argument("--repeat", type=int, default=3)
+    parse.set_defaults(func=bench_parse)
+
+    bloom = subparsers.add_parser("bloom", help=bench_bloom.__doc__)
+    bloom.add_argument("--urls", type=int, help="filter size (default: discovered_sources rows)")
+    bloom.add_argument("--probes", type=int, default=200_000)
+    bloom.add_argument("--database", default="database.db")
+    bloom.set_defaults(func=bench_bloom)
+
+    writer = subparsers.add_parser("writer", help=bench_writer.__doc__)
+    writer.add_argument("--posts", type=int, default=1000)
+    writer.add_argument("--batch-size", type=int, default=50)
+    writer.set_defaults(func=bench_writer)
+
+    extract = subparsers.add_parser("extract", help=bench_extract.__doc__)
+    extract.add_argument("pages", help="directory of saved article .html pages")
+    extract.add_argument("--repeat", type=int, default=3)
+    extract.add_argument("--workers", type=int, nargs="+",
+                         help="pool sizes to try (default: 1, 2, 4 and the core count)")
+    extract.set_defaults(func=bench_extract)
+
+    embed = subparsers.add_parser("embed", help=bench_embed.__doc__)
+    embed.add_argument("--posts", type=int, default=10_000)
+    embed.add_argument("--words", type=int, default=200)
+    embed.add_argument("--batch-size", type=int, default=64)
+    embed.set_defaults(func=bench_embed)
+
+    prep = subparsers.add_parser("prep", help=bench_prep.__doc__)
+    prep.add_argument("--posts", type=int, default=500)
+    prep.add_argument("--words", type=int, default=3000)
+    prep.add_argument("--sampled-chunks", type=int, default=0)
+    prep.add_argument("--batch-size", type=int, default=64)
+    prep.add_argument("--encode", action="store_true", help="also time the model (needs sentence_transformers)")
+    prep.set_defaults(func=bench_prep)
+
+    backends = subparsers.add_parser("backends", help=bench_backends.__doc__)
+    backends.add_argument("--backends", nargs="+", default=["onnx", "onnx-int8"])
+    backends.add_argument("--database", help="take the corpus from this database's posts")
+    backends.add_argument("--posts", type=int, default=1000)
+    backends.add_argument("--words", type=int, default=300)
+    backends.add_argument("--batch-size", type=int, default=64)
+    backends.add_argument("--latency-runs", type=int, default=200)
+    backends.set_defaults(func=bench_backends)
+
+    score = subparsers.add_parser("score", help=bench_score.__doc__)
+    score.add_argument("--posts", type=int, default=5000)
+    score.add_argument("--words", type=int, default=500)
+    score.set_defaults(func=bench_score)
+
+    keywords = subparsers.add_parser("keywords", help=bench_keywords.__doc__)
+    keywords.add_argument("--posts", type=int, default=2000)
+    keywords.add_argument("--words", type=int, default=500)
+    keywords.add_argument("--terms", type=int, nargs="+", default=[21, 300, 3000])
+    keywords.set_defaults(func=bench_keywords)
+
+    replay = subparsers.add_parser("replay", help=bench_replay.__doc__)
+    replay.add_argument("--paragraphs", type=int, default=5000)
+    replay.add_argument("--repeat", type=int, default=200)
+    replay.set_defaults(func=bench_replay)
+
+    crawl = subparsers.add_parser("crawl", help=bench_crawl.__doc__)
+    crawl.add_argument("fixtures", help="directory written by crawler.py --record")
+    crawl.add_argument("--database", default="database.db",
+                       help="database snapshot taken before the recorded crawl")
+    crawl.add_argument("--async", dest="concurrent", action="store_true")
+    crawl.set_defaults(func=bench_crawl)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# bloom_filter.py
+import hashlib
+import logging
+import math
+import os
+import struct
+import threading
+
+logger = logging.getLogger(__name__)
+
+SEEN_URLS_FILE = "seen_urls.bloom"
+DEFAULT_CAPACITY = 1_000_000
+DEFAULT_ERROR_RATE = 0.001
+
+_HEADER = struct.Struct("<8sQQQQd")  # magic, bits, hashes, count, max source id, error rate
+_MAGIC = b"VFBLOOM1"
+
+_seen_urls = None
+_seen_urls_lock = threading.Lock()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter: answers "definitely new" or "probably seen" for strings"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.max_source_id = 0
+        self.lock = threading.Lock()
+
+    def positions(self, item):
+        # Double hashing: k positions from two independent 64-bit halves
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        positions = self.positions(item)
+        with self.lock:
+            for pos in positions:
+                self.bits[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self.positions(item))
+
+    @property
+    def memory_bytes(self):
+        return len(self.bits)
+
+    def expected_error_rate(self):
+        """False-positive rate at the current fill level"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def save(self, path):
+        tmp_path = path + ".tmp"
+        with self.lock, open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(
+                _MAGIC, self.num_bits, self.num_hashes, self.count,
+                self.max_source_id, self.error_rate,
+            ))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            magic, num_bits, num_hashes, count, max_source_id, error_rate = _HEADER.unpack(
+                f.read(_HEADER.size)
+            )
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a Bloom filter file")
+            bloom = cls.__new__(cls)
+            bloom.num_bits = num_bits
+            bloom.num_hashes = num_hashes
+            bloom.count = count
+            bloom.max_source_id = max_source_id
+            bloom.error_rate = error_rate
+            bloom.capacity = int(-num_bits * math.log(2) ** 2 / math.log(error_rate))
+            bloom.bits = bytearray(f.read())
+            bloom.lock = threading.Lock()
+        return bloom
+
+
+def add_sources_since(bloom, conn):
+    """Add discovered_sources rows newer than the filter's high-water id"""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id, url FROM discovered_sources WHERE id > ? ORDER BY id",
+        (bloom.max_source_id,),
+    )
+    for source_id, url in cursor:
+        bloom.add(url)
+        bloom.max_source_id = source_id
+
+
+def build_seen_urls(conn):
+    """Rebuild the filter from discovered_sources, sized for twice the current table"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM discovered_sources")
+    capacity = max(DEFAULT_CAPACITY, cursor.fetchone()[0] * 2)
+    bloom = BloomFilter(capacity)
+    add_sources_since(bloom, conn)
+    return bloom
+
+
+def get_seen_urls(conn, path=SEEN_URLS_FILE):
+    """Process-wide seen-URL filter, loaded from disk and caught up with the table"""
+    global _seen_urls
+    with _seen_urls_lock:
+        if _seen_urls is not None:
+            return _seen_urls
+
+        bloom = None
+        if os.path.exists(path):
+            try:
+                bloom = BloomFilter.load(path)
+                add_sources_since(bloom, conn)
+            except Exception as e:
+                logger.warning(f"Could not load {path}, rebuilding: {str(e)}")
+                bloom = None
+        if bloom is None or bloom.count > bloom.capacity:
+            bloom = build_seen_urls(conn)
+
+        logger.info(
+            f"Seen-URL filter: {bloom.count} URLs, {bloom.memory_bytes / 1e6:.1f} MB, "
+            f"{bloom.num_hashes} hashes, expected false-positive rate "
+            f"{bloom.expected_error_rate():.2e}"
+        )
+        _seen_urls = bloom
+        return bloom
+
+
+def save_seen_urls(path=SEEN_URLS_FILE):
+    """Persist the process-wide filter if it was loaded"""
+    if _seen_urls is not None:
+        _seen_urls.save(path)
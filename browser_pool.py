@@ -0,0 +1,173 @@
+# browser_pool.py
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from playwright.sync_api import sync_playwright
+
+import http_fixtures
+
+logger = logging.getLogger(__name__)
+
+BROWSER_TYPE = "firefox"
+BROWSER_POOL_SIZE = 2  # Warm browsers, and so the cap on pages open at once
+BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media"}
+JOB_TIMEOUT_SECONDS = 180  # Queueing, a browser launch and a 30s page.goto, with room to spare
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def block_heavy_resources(route):
+    """Abort requests a listing page does not need to render its links"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        # Let context-level handlers (fixture record/replay) see the request
+        route.fallback()
+
+
+class BrowserPool:
+    """Long-lived Playwright browsers that hand out pages to blocking callers.
+
+    The sync Playwright API is bound to the thread that started it, so each
+    worker thread owns one browser and one warm context for its lifetime and
+    callers submit jobs instead of touching the browser directly.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, browser_type=BROWSER_TYPE):
+        self.size = size
+        self.browser_type = browser_type
+        self.jobs = queue.Queue()
+        self.workers = []
+        self.lock = threading.Lock()
+        self.stats = {
+            "launches": 0,
+            "launch_seconds": 0.0,
+            "pages": 0,
+            "page_seconds": 0.0,
+        }
+
+    def start(self):
+        with self.lock:
+            if self.workers:
+                return
+            for i in range(self.size):
+                worker = threading.Thread(
+                    target=self.work, name=f"browser-{i}", daemon=True
+                )
+                worker.start()
+                self.workers.append(worker)
+
+    def run(self, fn, *args, lightweight=True, timeout=JOB_TIMEOUT_SECONDS):
+        """Call fn(page, *args) on a pooled page and return its result.
+
+        With lightweight=True images, fonts and CSS are blocked, which is all
+        a listing page needs. Raises concurrent.futures.TimeoutError if no
+        result arrives within timeout seconds; the job is cancelled if it has
+        not started yet.
+        """
+        self.start()
+        future = Future()
+        self.jobs.put((fn, args, lightweight, future))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def launch(self, playwright):
+        started = time.monotonic()
+        browser = getattr(playwright, self.browser_type).launch(headless=True)
+        context = browser.new_context()
+        route_handler = http_fixtures.playwright_route_handler()
+        if route_handler:
+            context.route("**/*", route_handler)
+        elapsed = time.monotonic() - started
+        with self.lock:
+            self.stats["launches"] += 1
+            self.stats["launch_seconds"] += elapsed
+        logger.info(f"Launched {self.browser_type} for the browser pool in {elapsed:.2f}s")
+        return browser, context
+
+    def fail_pending(self, error):
+        """Fail every queued job with error, for when no worker is left to run them"""
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None and job[3].set_running_or_notify_cancel():
+                job[3].set_exception(error)
+
+    def work(self):
+        playwright = browser = context = None
+        try:
+            playwright = sync_playwright().start()
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                fn, args, lightweight, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if browser is None or not browser.is_connected():
+                        browser, context = self.launch(playwright)
+                    page = context.new_page()
+                    if lightweight:
+                        page.route("**/*", block_heavy_resources)
+                    started = time.monotonic()
+                    try:
+                        result = fn(page, *args)
+                    finally:
+                        page.close()
+                        with self.lock:
+                            self.stats["pages"] += 1
+                            self.stats["page_seconds"] += time.monotonic() - started
+                    future.set_result(result)
+                except Exception as e:
+                    future.set_exception(e)
+        except Exception as e:
+            logger.error(f"Browser pool worker {threading.current_thread().name} failed: {e}")
+            with self.lock:
+                if threading.current_thread() in self.workers:
+                    self.workers.remove(threading.current_thread())
+                last_worker = not self.workers
+            # Queued callers would otherwise wait on futures nobody will resolve;
+            # the next run() starts fresh workers
+            if last_worker:
+                self.fail_pending(e)
+        finally:
+            if browser is not None:
+                browser.close()
+            if playwright is not None:
+                playwright.stop()
+
+    def close(self):
+        """Stop all workers, closing their browsers, and log launch vs page time"""
+        with self.lock:
+            workers, self.workers = self.workers, []
+        for _ in workers:
+            self.jobs.put(None)
+        for worker in workers:
+            worker.join(timeout=30)
+        if workers:
+            logger.info(
+                f"Browser pool: {self.stats['launches']} launches took "
+                f"{self.stats['launch_seconds']:.2f}s, {self.stats['pages']} pages took "
+                f"{self.stats['page_seconds']:.2f}s"
+            )
+
+
+def get_browser_pool():
+    """Process-wide browser pool, started on first use and closed at exit"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
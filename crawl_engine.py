@@ -0,0 +1,146 @@
+# crawl_engine.py
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import crawler
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY = 16      # Fetches in flight across all hosts
+PER_HOST_CONCURRENCY = 2  # Fetches in flight against any single host
+FLUSH_CHECK_SECONDS = 1   # How often buffered posts are checked against the writer's interval
+
+
+class AsyncCrawlEngine:
+    """Crawl many sources at once with bounded global and per-host concurrency.
+
+    Listing pages and article downloads are still done by the blocking helpers
+    in crawler.py; the engine runs them on worker threads so fetches for every
+    selected source overlap. Article parsing is CPU-bound and goes to the
+    crawler's extraction process pool, while all SQLite writes stay on the
+    event loop thread through a batched PostWriter.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, per_host=PER_HOST_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.pages_fetched = 0  # Pages actually received, as counted by crawler.count_fetch
+        self.posts_saved = 0
+        self.seen_ids = set()
+
+    def host_slot(self, url):
+        """Semaphore limiting concurrent fetches against the host of url"""
+        host = urlparse(url).netloc.lower()
+        if host not in self.host_limits:
+            self.host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self.host_limits[host]
+
+    async def fetch(self, url, func, *args):
+        """Run a blocking fetch helper on a worker thread once both limits allow it"""
+        async with self.global_limit, self.host_slot(url):
+            return await asyncio.to_thread(func, *args)
+
+    async def fetch_article(self, post):
+        """First non-empty article text among a post's URLs, parsed in the process pool"""
+        loop = asyncio.get_running_loop()
+        for article_url in post.get("article_urls", []):
+            html = await self.fetch(article_url, crawler.download_article, article_url)
+            if not html:
+                continue
+            try:
+                article_text = await loop.run_in_executor(
+                    crawler.get_extraction_pool(), crawler.parse_article, article_url, html
+                )
+            except Exception as e:
+                logger.error(f"Article extraction failed for {post['url']}: {str(e)}")
+                continue
+            if article_text:
+                return article_text
+        return ""
+
+    async def finish_post(self, pending_post):
+        """Fetch, complete and queue one post for writing; returns whether it was saved"""
+        try:
+            article_text = await self.fetch_article(pending_post)
+            post = crawler.complete_post(pending_post, article_text)
+            self.writer.add(post)
+        except Exception as e:
+            # One bad post must not fail its siblings or the source's crawl stats
+            logger.error(f"Saving post failed for {pending_post['url']}: {str(e)}")
+            return False
+        self.posts_saved += 1
+        logger.info(f"Saved {post['source']} post: {post['title'][:60]}...")
+
+        if pending_post.get("discover_from") and post["content"]:
+            try:
+                crawler.discover_new_sources(pending_post["discover_from"], post["content"], self.conn)
+            except Exception as e:
+                logger.error(f"Source discovery failed for {pending_post['url']}: {str(e)}")
+        return True
+
+    async def crawl_source(self, url, source_type):
+        logger.info(f"Scraping source: {url}")
+        saved = 0
+        try:
+            pending = await self.fetch(url, crawler.collect_source, url, source_type)
+            # Several sources can list the same story; fetch it only once per run
+            pending = [post for post in pending if post["id"] not in self.seen_ids]
+            self.seen_ids.update(post["id"] for post in pending)
+            saved = sum(await asyncio.gather(*(self.finish_post(post) for post in pending)))
+        except Exception as e:
+            logger.error(f"Scraping failed for {url}: {str(e)}")
+        crawler.mark_crawled(url, saved)
+
+    async def crawl(self, sources):
+        # Primitives must be created inside the running loop
+        self.global_limit = asyncio.Semaphore(self.max_concurrency)
+        self.host_limits = {}
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=self.max_concurrency)
+        )
+        flusher = asyncio.create_task(self.flush_periodically())
+        try:
+            await asyncio.gather(*(self.crawl_source(url, source_type) for url, source_type in sources))
+        finally:
+            flusher.cancel()
+
+    async def flush_periodically(self):
+        """Write buffered posts once they have waited the writer's interval, even between adds"""
+        while True:
+            await asyncio.sleep(FLUSH_CHECK_SECONDS)
+            try:
+                self.writer.flush_if_due()
+            except Exception as e:
+                logger.error(f"Periodic post flush failed: {str(e)}")
+
+    def run(self, sources):
+        """Crawl all sources concurrently and report throughput"""
+        self.conn = crawler.get_db_connection()
+        self.writer = crawler.PostWriter(self.conn)
+        # Listings may span several pages and failed downloads fetch nothing, so
+        # count what crawler's HTTP and browser paths actually received
+        fetched_before = crawler.pages_fetched()
+        started = time.monotonic()
+        try:
+            asyncio.run(self.crawl(sources))
+        finally:
+            self.writer.flush()
+            self.conn.close()
+            self.pages_fetched = crawler.pages_fetched() - fetched_before
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        logger.info(
+            f"Crawled {len(sources)} sources: {self.pages_fetched} pages, "
+            f"{self.posts_saved} posts in {elapsed:.1f}s "
+            f"({self.pages_fetched / elapsed:.2f} pages/sec)"
+        )
+        return {
+            "sources": len(sources),
+            "pages": self.pages_fetched,
+            "posts": self.posts_saved,
+            "seconds": elapsed,
+            "pages_per_sec": self.pages_fetched / elapsed,
+        }
@@ -1,17 +1,30 @@
 # crawler.py
-from playwright.sync_api import sync_playwright
 from newspaper import Article
 import sqlite3
 import datetime
-import time
 import requests
-from bs4 import BeautifulSoup
-import random
 from config import INTEREST_CONFIG
+from rate_limiter import HostRateLimiter
+from browser_pool import get_browser_pool
+import http_cache
+import dedup
+import page_archive
+import link_frontier
+from source_canonical import canonical_source
+import http_fixtures
+from ingest_cursors import load_cursor, save_cursor, hn_item_number, reddit_item_number
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from bloom_filter import get_seen_urls, add_sources_since, save_seen_urls
+from html_document import HtmlDocument, NON_CONTENT_EXTENSIONS
 import logging
+import atexit
+import os
+import threading
 import re
 import hashlib
-from urllib.parse import urljoin  # For resolving relative URLs
+import argparse
+import time
+from urllib.parse import urljoin, urlparse  # For resolving relative URLs
 
 # Configure logging
 logging.basicConfig(
@@ -22,493 +35,1108 @@ logger = logging.getLogger(__name__)
 DATABASE = "database.db"
 HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; WebScout/1.0)"}
 SOURCE_QUALITY_THRESHOLD = 0.65
+SOURCES_PER_RUN = 4  # Optimal for hourly processing
+FRONTIER_SHARE = 0.5  # Part of each run's source budget spent exploring new links
+ASYNC_SOURCES_PER_RUN = 16  # Concurrent crawls overlap fetches, so afford more
+POST_BATCH_SIZE = 50      # Posts per write transaction
+POST_FLUSH_SECONDS = 10   # Longest a crawled post waits in the write buffer
+ID_BATCH_SIZE = 500       # Ids per IN (...) existence query
+ARCHIVE_PAGES = False     # Keep compressed raw pages for offline re-extraction
+MIN_RECRAWL_HOURS = 1     # Recrawl interval of a source that changes on every visit
+MAX_RECRAWL_HOURS = 72    # Longest a source waits between visits, however static
+FRESHNESS_ALPHA = 0.3     # Weight of the latest visit in the freshness moving average
+EXTRACTION_WORKERS = os.cpu_count() or 1  # Processes parsing downloaded articles
+CONNECT_TIMEOUT = 5         # Seconds to establish a connection
+READ_TIMEOUT = 10           # Seconds to wait for each chunk of a response
+DOWNLOAD_DEADLINE = 30      # Seconds any one body may take to stream in full
+MAX_PAGE_BYTES = 2_000_000  # Bodies are cut off here; enough for any listing or article
+MAX_CONTENT_CHARS = 20_000  # Stored post content ceiling, well past what scoring reads
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml"}
+FALLBACK_SOURCES = [
+    ("https://news.ycombinator.com/", "webpage"),
+    ("https://old.reddit.com/r/artificial/", "reddit"),
+    ("https://arxiv.org/list/cs.AI/recent", "webpage"),
+]
+
+# One pooled session for every fetch; record/replay adapters mount onto it
+SESSION = http_fixtures.install(requests.Session())
+# Politeness is enforced per host, so requests to different hosts never wait on each other
+RATE_LIMITER = HostRateLimiter(user_agent=HEADERS["User-Agent"], session=SESSION)
+
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+_fetch_count = 0
+_fetch_count_lock = threading.Lock()
 
 def get_db_connection():
-    return sqlite3.connect(DATABASE)
+    conn = sqlite3.connect(DATABASE, timeout=30)
+    # Safe under WAL (set by db_init): commits no longer fsync the main database
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def read_bounded(res, url, max_bytes=MAX_PAGE_BYTES):
+    """Stream a response body into memory, stopping at max_bytes or DOWNLOAD_DEADLINE"""
+    chunks = []
+    size = 0
+    started = time.monotonic()
+    try:
+        for chunk in res.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                logger.info(f"Truncated {url} at {max_bytes} bytes")
+                break
+            if time.monotonic() - started > DOWNLOAD_DEADLINE:
+                logger.warning(f"Gave up on {url} after {DOWNLOAD_DEADLINE}s, keeping {size} bytes")
+                break
+    finally:
+        res.close()
+    # Later .content/.text reads see the capped body instead of the stream
+    res._content = b"".join(chunks)[:max_bytes]
+    return res
 
-def discover_new_sources(url, content):
-    """Discover new potential sources from page content with quality inheritance"""
+def count_fetch():
+    """Record one page actually received (status 200, over the network or from replay fixtures)"""
+    global _fetch_count
+    with _fetch_count_lock:
+        _fetch_count += 1
+
+def pages_fetched():
+    """Pages received by this process so far, across threads"""
+    with _fetch_count_lock:
+        return _fetch_count
+
+def content_type(res):
+    return res.headers.get("Content-Type", "").split(";")[0].strip().lower()
+
+def http_get(url, headers=None, content_types=None, max_bytes=MAX_PAGE_BYTES, **kwargs):
+    """GET a URL once the host's rate limiter allows it, with a bounded body.
+
+    With content_types set, a response of any other declared type is closed
+    before its body is read and None is returned.
+    """
+    RATE_LIMITER.wait(url)
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    res = SESSION.get(url, headers={**HEADERS, **(headers or {})}, stream=True, **kwargs)
+    if content_types and content_type(res) and content_type(res) not in content_types:
+        logger.info(f"Skipping {content_type(res)} response from {url}")
+        res.close()
+        return None
+    read_bounded(res, url, max_bytes)
+    if res.status_code == 200:
+        count_fetch()
+    return res
+
+def fetch_listing(url, **kwargs):
+    """Conditionally GET a listing page, returning None when it has not changed"""
     conn = get_db_connection()
+    try:
+        res = http_get(url, headers=http_cache.conditional_headers(conn, url), **kwargs)
+        if not http_cache.record_response(conn, url, res):
+            logger.info(f"Listing unchanged since last crawl, skipping: {url}")
+            return None
+        if ARCHIVE_PAGES and res.status_code == 200:
+            page_archive.store(conn, url, res.text, kind="listing")
+        return res
+    finally:
+        conn.close()
+
+def listing_unchanged(url, html):
+    """Body-hash check for listings fetched outside requests (e.g. via Playwright)"""
+    conn = get_db_connection()
+    try:
+        return not http_cache.record_body(conn, url, html)
+    finally:
+        conn.close()
+
+def classify_source(link):
+    """Determine source type from a link's host"""
+    if "reddit.com" in link:
+        return "reddit"
+    elif "arxiv.org" in link:
+        return "arxiv"
+    elif "github.com" in link:
+        return "github"
+    elif "substack.com" in link:
+        return "substack"
+    elif "medium.com" in link:
+        return "medium"
+    elif "ycombinator.com" in link:
+        return "hackernews"
+    elif "twitter.com" in link:
+        return "twitter"
+    return "unknown"
+
+def filter_new_links(cursor, links):
+    """Diff links against discovered_sources in one set-based query"""
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS candidate_links (url TEXT PRIMARY KEY)")
+    cursor.execute("DELETE FROM candidate_links")
+    cursor.executemany(
+        "INSERT OR IGNORE INTO candidate_links (url) VALUES (?)", ((link,) for link in links)
+    )
+    cursor.execute("""
+        SELECT c.url FROM candidate_links c
+        WHERE NOT EXISTS (SELECT 1 FROM discovered_sources d WHERE d.url = c.url)
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+def discover_new_sources(url, content, conn=None):
+    """Discover new potential sources from page content with quality inheritance.
+
+    content may be raw HTML or an already parsed HtmlDocument. Links are
+    first collapsed to their canonical source (site root, subreddit or feed),
+    dropping the page's own site. Sources the
+    seen-URL Bloom filter has probably seen are dropped without touching
+    SQLite; the rest are classified in memory, diffed against existing sources in one
+    query and inserted with a single executemany. Each new link is also
+    scored from its anchor text and context and queued on the link_discovery
+    frontier, which decides when it is first crawled. Pass the caller's
+    connection to avoid opening a new one per page.
+    """
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        soup = BeautifulSoup(content, "html.parser")
-        links = set()
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            # Resolve relative URLs AND absolute automicatically
-            absolute_url = urljoin(url, href)
-            # Filter out non-http links
-            if not absolute_url.startswith("http"):
-                continue
-            # Normalize URL
-            normalized_url = absolute_url.split('#')[0].split('?')[0]
-            links.add(normalized_url)
+        doc = content if isinstance(content, HtmlDocument) else HtmlDocument(content, url)
+        links = doc.links()
+        own_source = canonical_source(url)
+        sources = {canonical_source(link) for link in links} - {None, own_source}
+        seen_urls = get_seen_urls(conn)
+        candidates = [source for source in sources if source not in seen_urls]
+        if not candidates:
+            logger.info(f"No new potential sources among {len(links)} links from {url}")
+            return 0
         
         # Get parent source quality
-        cursor.execute("SELECT quality_score FROM discovered_sources WHERE url = ?", (url,))
+        cursor.execute(
+            "SELECT quality_score FROM discovered_sources WHERE url IN (?, ?)", (url, own_source)
+        )
         parent_row = cursor.fetchone()
         parent_quality = parent_row[0] if parent_row else 1.0
-        
-        for link in links:
-            # Filter out non-content links
-            if any(ext in link for ext in ['.png', '.jpg', '.jpeg', '.gif', '.pdf', '.zip', '.css', '.js']):
-                continue
-                
-            # Check if source already exists
-            cursor.execute("SELECT 1 FROM discovered_sources WHERE url = ?", (link,))
-            if cursor.fetchone():
-                continue
-                
-            # Determine source type
-            source_type = "unknown"
-            if "reddit.com" in link:
-                source_type = "reddit"
-            elif "arxiv.org" in link:
-                source_type = "arxiv"
-            elif "github.com" in link:
-                source_type = "github"
-            elif "substack.com" in link:
-                source_type = "substack"
-            elif "medium.com" in link:
-                source_type = "medium"
-            elif "ycombinator.com" in link:
-                source_type = "hackernews"
-            elif "twitter.com" in link:
-                source_type = "twitter"
-                
-            # Calculate new quality (inherit 90% of parent quality)
-            new_quality = parent_quality * 0.9
-            is_estimated = 1  # Mark as estimated quality
-            
-            # Add new source
-            cursor.execute("""
-                INSERT OR IGNORE INTO discovered_sources 
-                (url, source_type, discovery_method, parent_url, 
-                 quality_score, estimated_quality, discovered_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                link, 
-                source_type, 
-                "link_follow", 
-                url, 
-                new_quality,
-                is_estimated,
-                datetime.datetime.utcnow().isoformat()
-            ))
+
+        # Calculate new quality (inherit 90% of parent quality), marked as estimated
+        new_quality = parent_quality * 0.9
+        discovered_at = datetime.datetime.utcnow().isoformat()
+        new_links = filter_new_links(cursor, candidates)
+
+        cursor.executemany("""
+            INSERT OR IGNORE INTO discovered_sources 
+            (url, source_type, discovery_method, parent_url, 
+             quality_score, estimated_quality, discovered_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (link, classify_source(link), "link_follow", url, new_quality, 1, discovered_at)
+            for link in new_links
+        ])
+        if new_links:
+            # Anchor context is only worth reading for links to sources that are new
+            new_sources = set(new_links)
+            wanted = {link for link in links if canonical_source(link) in new_sources}
+            anchors = {}
+            for link, anchor in doc.anchors(wanted).items():
+                anchors.setdefault(canonical_source(link), []).append(anchor)
+            link_frontier.push_links(cursor, url, new_links, anchors, parent_quality)
         
         conn.commit()
-        logger.info(f"Discovered {len(links)} new potential sources from {url}")
+        add_sources_since(seen_urls, conn)
+        logger.info(f"Discovered {len(new_links)} new potential sources "
+                    f"out of {len(links)} links from {url}")
+        return len(new_links)
     except Exception as e:
         logger.error(f"Discovery failed for {url}: {str(e)}")
         conn.rollback()
+        return 0
     finally:
-        conn.close()
+        if owns_conn:
+            conn.close()
 
-def extract_article_text(url):
+def parse_article(url, html):
+    """Main text of a downloaded article page"""
     try:
         article = Article(url)
-        article.download()
+        article.download(input_html=html)
         article.parse()
-        return article.text
+        return article.text[:MAX_CONTENT_CHARS]
     except Exception:
         try:
-            res = requests.get(url, headers=HEADERS, timeout=10)
-            if res.status_code != 200:
-                return ""
-            soup = BeautifulSoup(res.text, "html.parser")
-
-            # Try to find main content
-            article = soup.find("article")
-            if article:
-                return article.get_text()
-
-            # Fallback to paragraph collection
-            paragraphs = soup.find_all("p")
-            return "\n".join(p.get_text() for p in paragraphs if p.get_text())
+            return HtmlDocument(html, url).article_text()[:MAX_CONTENT_CHARS]
         except Exception:
             return ""
 
+def download_article(url):
+    """Download an article page, returning its HTML or None for non-HTML and failed fetches"""
+    if urlparse(url).path.lower().endswith(tuple(NON_CONTENT_EXTENSIONS)):
+        return None
+    try:
+        res = http_get(url, content_types=HTML_CONTENT_TYPES)
+        if res is None or res.status_code != 200:
+            return None
+        html = res.text
+    except Exception:
+        return None
+
+    if ARCHIVE_PAGES:
+        conn = get_db_connection()
+        try:
+            page_archive.store(conn, url, html, kind="article")
+        finally:
+            conn.close()
+    return html
+
+def extract_article_text(url):
+    """Download a page once and extract its main text in this process"""
+    html = download_article(url)
+    return parse_article(url, html) if html else ""
+
+def get_extraction_pool():
+    """Process-wide pool running parse_article, sized by EXTRACTION_WORKERS"""
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS)
+            atexit.register(_extraction_pool.shutdown)
+            logger.info(f"Started {EXTRACTION_WORKERS} article extraction workers")
+        return _extraction_pool
+
 def post_exists(conn, post_id):
     cursor = conn.cursor()
     cursor.execute("SELECT 1 FROM posts WHERE id = ?", (post_id,))
     exists = cursor.fetchone() is not None
     return exists
 
-def save_post(conn, post):
+def existing_post_ids(conn, post_ids):
+    """Which of a listing page's post ids are already stored, in one query per batch"""
+    post_ids = [post_id for post_id in set(post_ids) if post_id]
+    existing = set()
     cursor = conn.cursor()
-    cursor.execute(
-        """
-        INSERT OR IGNORE INTO posts 
-        (id, title, url, content, source, created_at, last_updated)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """,
-        (
+    for i in range(0, len(post_ids), ID_BATCH_SIZE):
+        batch = post_ids[i:i + ID_BATCH_SIZE]
+        cursor.execute(
+            f"SELECT id FROM posts WHERE id IN ({','.join('?' * len(batch))})", batch
+        )
+        existing.update(row[0] for row in cursor.fetchall())
+    return existing
+
+def insert_posts(conn, posts):
+    """Insert posts without committing, linking near-duplicates to their canonical copy"""
+    rows = []
+    canonical_of = {}
+    for post in posts:
+        canonical_id = dedup.register_post(conn, post["id"], post["content"])
+        # A duplicate of another post in the same batch points at that post's canonical
+        canonical_id = canonical_of.get(canonical_id, canonical_id)
+        if canonical_id:
+            canonical_of[post["id"]] = canonical_id
+        rows.append((
             post["id"],
             post["title"],
             post["url"],
             post["content"],
             post["source"],
+            canonical_id,
             post["created_at"],
             post["created_at"],
-        ),
+        ))
+    cursor = conn.cursor()
+    cursor.executemany(
+        """
+        INSERT OR IGNORE INTO posts 
+        (id, title, url, content, source, canonical_id, created_at, last_updated)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+        rows,
     )
+
+def save_post(conn, post):
+    """Insert and commit a single post"""
+    insert_posts(conn, [post])
     conn.commit()
 
-def scrape_hacker_news(limit=30):
-    conn = get_db_connection()
-    try:
-        with sync_playwright() as p:
-            browser = p.firefox.launch(headless=True)
-            page = browser.new_page()
-            page.goto("https://news.ycombinator.com/")
+class PostWriter:
+    """Buffer crawled posts and write them in one transaction every N posts or T seconds.
+
+    add() enforces both bounds, but with no new posts arriving nothing calls
+    it, so long-running callers also call flush_if_due() periodically to keep
+    a buffered post from waiting longer than T seconds.
+    """
+
+    def __init__(self, conn, batch_size=POST_BATCH_SIZE, flush_interval=POST_FLUSH_SECONDS):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.oldest = None  # When the oldest buffered post was added
+        self.written = 0
+
+    def add(self, post):
+        if not self.buffer:
+            self.oldest = time.monotonic()
+        self.buffer.append(post)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self):
+        """Flush if the oldest buffered post has waited flush_interval seconds"""
+        if self.buffer and time.monotonic() - self.oldest >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            try:
+                insert_posts(self.conn, self.buffer)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            self.written += len(self.buffer)
+            logger.info(f"Wrote {len(self.buffer)} posts in one transaction")
+            self.buffer = []
+        self.oldest = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+HN_URL = "https://news.ycombinator.com/"
+ARXIV_URL = "https://arxiv.org/list/cs.AI/recent"
+
+def parse_hacker_news(doc):
+    """Pending posts for every story row on an HN listing"""
+    posts = []
+    for item in doc.soup.select("tr.athing"):
+        post_id = item.get("id")
+        title_link = item.select_one(".titleline a")
+        if not post_id or not title_link:
+            continue
+
+        title = title_link.get_text().strip()
+        external_url = title_link.get("href", "")
+        hn_comments_url = f"https://news.ycombinator.com/item?id={post_id}"
+
+        # Prefer the linked article, fall back to the discussion page
+        article_urls = [hn_comments_url]
+        if external_url.startswith("http"):
+            article_urls.insert(0, external_url)
+
+        posts.append({
+            "id": post_id,
+            "title": title,
+            "url": (
+                external_url if external_url.startswith("http") else hn_comments_url
+            ),
+            "content": title,
+            "article_urls": article_urls,
+            "source": "hackernews",
+            "created_at": datetime.datetime.utcnow(),
+        })
+    return posts
+
+def parse_reddit_listing(doc):
+    """Pending posts on an old.reddit listing page, plus the next page's URL"""
+    soup = doc.soup
+    posts = []
+    for entry in soup.find_all("div", class_="thing"):
+        post_id = entry.get("data-fullname")
+        if not post_id:
+            continue
+
+        title_tag = entry.find("a", class_="title")
+        if not title_tag:
+            continue
+
+        title = title_tag.text.strip()
+        post_url = entry.get("data-url")
+        if post_url and post_url.startswith("/"):
+            post_url = "https://old.reddit.com" + post_url
+
+        selftext_div = entry.find("div", class_="expando")
+        snippet = (
+            selftext_div.text.strip()[:500]
+            if selftext_div and selftext_div.text.strip()
+            else ""
+        )
+
+        posts.append({
+            "id": post_id,
+            "title": title,
+            "url": post_url if post_url else "",
+            "content": title + "\n\n" + snippet if snippet else title,
+            "article_urls": (
+                [post_url] if post_url and post_url.startswith("http") else []
+            ),
+            "source": "reddit",
+            "created_at": datetime.datetime.utcnow(),
+        })
+
+    next_btn = soup.find("span", class_="next-button")
+    next_url = next_btn.a["href"] if next_btn and next_btn.a else None
+    return posts, next_url
+
+def parse_arxiv_listing(doc):
+    """Posts for the first papers on an arXiv listing, built from their abstracts"""
+    papers = doc.soup.select("dt + dd")  # Get all dd elements following dt
+    if not papers:
+        logger.warning("No papers found on arXiv page")
+
+    posts = []
+    for paper in papers[:10]:  # Limit to 10 papers
+        try:
+            # Get the preceding dt element which contains the ID and links
+            dt = paper.find_previous("dt")
+            if not dt:
+                continue
+
+            # Extract paper ID and URL
+            paper_link = dt.find("a", href=lambda x: x and "/abs/" in x)
+            if not paper_link:
+                continue
+
+            paper_id = paper_link.get("id")
+            paper_url = f"https://arxiv.org{paper_link['href']}"
+
+            # Extract title
+            title_tag = paper.find("div", class_="list-title")
+            if not title_tag:
+                continue
+            title = title_tag.text.replace("Title:", "").strip()
+
+            # Extract authors
+            authors_tag = paper.find("div", class_="list-authors")
+            authors = (
+                authors_tag.text.replace("Authors:", "").strip()
+                if authors_tag
+                else "Unknown"
+            )
+
+            # Extract abstract - look in both meta and abstract div
+            abstract = ""
+            abstract_tag = paper.find("p", class_="mathjax")
+            if not abstract_tag:
+                abstract_tag = paper.find("div", class_="abstract")
+            if abstract_tag:
+                abstract = abstract_tag.text.replace("Abstract:", "").strip()
+
+            # Extract subjects/categories
+            subjects_tag = paper.find("div", class_="list-subjects")
+            subjects = (
+                subjects_tag.text.replace("Subjects:", "").strip()
+                if subjects_tag
+                else ""
+            )
+
+            content = f"Title: {title}\n\nAuthors: {authors}\n\nSubjects: {subjects}\n\nAbstract: {abstract or 'No abstract available'}"
+
+            posts.append({
+                "id": paper_id,
+                "title": title,
+                "url": paper_url,
+                "content": content,
+                "source": "arxiv",
+                "created_at": datetime.datetime.utcnow(),
+            })
+
+        except Exception as e:
+            logger.error(f"Error processing arXiv paper: {str(e)}")
+            continue
+    return posts
+
+def parse_webpage_listing(doc, source_type):
+    """Pending posts for the article links on a generic listing page"""
+    soup = doc.soup
+    articles = soup.find_all("article") or soup.select(".post, .article, .entry")
+
+    posts = []
+    for article in articles[:10]:  # Limit to 10 articles per page
+        title_elem = article.find(["h1", "h2", "h3"])
+        link_elem = article.find("a", href=True)
+        
+        if not title_elem or not link_elem:
+            continue
             
-            # Capture page content for source discovery
-            page_content = page.content()
-            discover_new_sources("https://news.ycombinator.com", page_content)
+        title = title_elem.text.strip()
+        link = link_elem["href"]
+        
+        if not link.startswith("http"):
+            link = urljoin(doc.url, link)
             
-            posts_fetched = 0
-            items = page.query_selector_all("tr.athing")
-            for item in items:
-                if posts_fetched >= limit:
-                    break
+        posts.append({
+            "id": hashlib.md5(link.encode()).hexdigest(),
+            "title": title,
+            "url": link,
+            "content": "",
+            "article_urls": [link],
+            "source": source_type,
+            "created_at": datetime.datetime.utcnow(),
+            # Discover new sources from content
+            "discover_from": doc.url,
+        })
+    return posts
 
-                post_id = item.get_attribute("id")
-                if not post_id or post_exists(conn, post_id):
-                    continue
+def parse_listing(url, source_type, doc):
+    """Dispatch a listing page to its parser, mirroring collect_source"""
+    if "ycombinator" in url:
+        return parse_hacker_news(doc)
+    elif "reddit" in url:
+        return parse_reddit_listing(doc)[0]
+    elif "arxiv" in url:
+        return parse_arxiv_listing(doc)
+    return parse_webpage_listing(doc, source_type)
 
-                title_link = item.query_selector(".titleline a")
-                if not title_link:
-                    continue
+def drop_existing(conn, posts, limit=None):
+    """Posts not yet stored, checked in one batch, capped at limit"""
+    existing = existing_post_ids(conn, [post["id"] for post in posts])
+    new_posts = [post for post in posts if post["id"] not in existing]
+    return new_posts[:limit] if limit is not None else new_posts
+
+def read_hacker_news_page(page, limit):
+    """Load the HN front page in a pooled browser page and return pending posts"""
+    conn = get_db_connection()
+    try:
+        page.goto(HN_URL)
+        count_fetch()
+        
+        # Capture page content once for source discovery and parsing
+        page_content = page.content()
+        if listing_unchanged(HN_URL, page_content):
+            logger.info(f"Listing unchanged since last crawl, skipping: {HN_URL}")
+            return []
+        if ARCHIVE_PAGES:
+            page_archive.store(conn, HN_URL, page_content, kind="listing")
+
+        doc = HtmlDocument(page_content, HN_URL)
+        discover_new_sources("https://news.ycombinator.com", doc, conn)
+        posts = parse_hacker_news(doc)
 
-                title = title_link.inner_text().strip()
-                external_url = title_link.get_attribute("href")
-                hn_comments_url = f"https://news.ycombinator.com/item?id={post_id}"
-
-                article_text = (
-                    extract_article_text(external_url)
-                    if external_url.startswith("http")
-                    else ""
-                )
-
-                if not article_text:
-                    article_text = extract_article_text(hn_comments_url)
-
-                content = title + "\n\n" + article_text.strip()
-
-                post = {
-                    "id": post_id,
-                    "title": title,
-                    "url": (
-                        external_url if external_url.startswith("http") else hn_comments_url
-                    ),
-                    "content": content,
-                    "source": "hackernews",
-                    "created_at": datetime.datetime.utcnow(),
-                }
-
-                save_post(conn, post)
-                posts_fetched += 1
-                logger.info(f"Saved HN post: {title[:60]}...")
-
-            browser.close()
-            logger.info(f"Finished scraping {posts_fetched} Hacker News posts.")
+        # The front page is ranked, not chronological, so older ids can still be
+        # new to us; only those need an existence check, anything above the mark is new
+        high_water = hn_item_number(load_cursor(conn, "hackernews")[0])
+        existing = existing_post_ids(
+            conn, [post["id"] for post in posts if hn_item_number(post["id"]) <= high_water]
+        )
+        pending = [post for post in posts if post["id"] not in existing][:limit]
+        newest = max([high_water] + [hn_item_number(post["id"]) for post in posts])
+        if newest > high_water:
+            save_cursor(conn, "hackernews", str(newest))
+        logger.info(
+            f"Hacker News: {len(pending)} new of {len(posts)} listed, "
+            f"high-water item {newest}"
+        )
+        return pending
     finally:
         conn.close()
 
-def scrape_reddit_subreddit(subreddit="all", limit=20):
+def collect_hacker_news(limit=30):
+    """Read the HN front page and return pending posts that still need article text"""
+    RATE_LIMITER.wait(HN_URL)
+    return get_browser_pool().run(read_hacker_news_page, limit)
+
+def scrape_hacker_news(limit=30):
+    conn = get_db_connection()
+    try:
+        saved = finish_posts(conn, collect_hacker_news(limit))
+        logger.info(f"Finished scraping {saved} Hacker News posts.")
+        return saved
+    finally:
+        conn.close()
+
+def collect_reddit_subreddit(subreddit="all", limit=20):
+    """Page through a subreddit listing and return pending posts that still need article text.
+
+    Paging stops at the first page holding nothing newer than the subreddit's
+    high-water fullname and nothing unstored. If the previous crawl ran out of
+    limit mid-listing, the walk then jumps to where that backlog left off
+    instead of re-reading the pages in between.
+    """
     logger.info(f"Scraping Reddit r/{subreddit}...")
-    url = f"https://old.reddit.com/r/{subreddit}/"
-    fetched = 0
+    listing_url = f"https://old.reddit.com/r/{subreddit}/"
+    url = listing_url
+    cursor_key = f"reddit:{subreddit}"
+    pending = []
+    pages = 0
 
     conn = get_db_connection()
     try:
-        while fetched < limit and url:
-            res = requests.get(url, headers=HEADERS)
-            if res.status_code != 200:
+        high_water, resume_after = load_cursor(conn, cursor_key)
+        high_water_number = reddit_item_number(high_water)
+        newest, newest_number = high_water, high_water_number
+
+        while len(pending) < limit and url:
+            res = fetch_listing(url)
+            if res is not None and res.status_code != 200:
                 logger.error(f"Error fetching Reddit: {res.status_code}")
                 break
 
-            # Discover sources from page content
-            discover_new_sources(url, res.text)
-                
-            soup = BeautifulSoup(res.text, "html.parser")
-            entries = soup.find_all("div", class_="thing")
-
-            for entry in entries:
-                if fetched >= limit:
-                    break
+            posts, new_posts, next_url, page_leftover = [], [], None, False
+            if res is not None:
+                pages += 1
+                # Parse once, then discover sources from page content
+                doc = HtmlDocument(res.text, url)
+                discover_new_sources(url, doc, conn)
 
-                post_id = entry.get("data-fullname")
-                if not post_id or post_exists(conn, post_id):
-                    continue
+                posts, next_url = parse_reddit_listing(doc)
+                new_posts = drop_existing(conn, posts)
+                taken = new_posts[:limit - len(pending)]
+                page_leftover = len(new_posts) > len(taken)
+                pending += taken
+                if any(post["id"] == resume_after for post in posts):
+                    resume_after = None  # walked into the old backlog without jumping
+                for post in posts:
+                    if reddit_item_number(post["id"]) > newest_number:
+                        newest, newest_number = post["id"], reddit_item_number(post["id"])
 
-                title_tag = entry.find("a", class_="title")
-                if not title_tag:
-                    continue
+            known_territory = not new_posts and all(
+                reddit_item_number(post["id"]) <= high_water_number for post in posts
+            )
+            if known_territory:
+                if not resume_after:
+                    break
+                logger.info(f"Reached known posts in r/{subreddit}, resuming after {resume_after}")
+                url = f"{listing_url}?count=25&after={resume_after}"
+                resume_after = None
+                continue
+            url = next_url
 
-                title = title_tag.text.strip()
-                post_url = entry.get("data-url")
-                if post_url and post_url.startswith("/"):
-                    post_url = "https://old.reddit.com" + post_url
-
-                selftext_div = entry.find("div", class_="expando")
-                snippet = (
-                    selftext_div.text.strip()[:500]
-                    if selftext_div and selftext_div.text.strip()
-                    else ""
-                )
-
-                article_text = (
-                    extract_article_text(post_url)
-                    if post_url and post_url.startswith("http")
-                    else ""
-                )
-
-                content = title + "\n\n" + snippet
-                if article_text:
-                    content += "\n\n" + article_text
-
-                post = {
-                    "id": post_id,
-                    "title": title,
-                    "url": post_url if post_url else "",
-                    "content": content,
-                    "source": "reddit",
-                    "created_at": datetime.datetime.utcnow(),
-                }
-
-                save_post(conn, post)
-                fetched += 1
-                logger.info(f"Saved Reddit post: {title[:60]}...")
-
-            next_btn = soup.find("span", class_="next-button")
-            url = next_btn.a["href"] if next_btn else None
-            time.sleep(2)  # Be polite
+        # Leftover backlog (limit hit with new posts left on this page, or more pages to
+        # come) resumes after the last post taken. Newer gaps are always re-walked from
+        # the top, so an older unfinished backlog keeps the single resume slot.
+        if not resume_after and pending and len(pending) >= limit and (page_leftover or url is not None):
+            resume_after = pending[-1]["id"]
+        save_cursor(conn, cursor_key, newest, resume_after)
+    finally:
+        conn.close()
+    logger.info(f"Reddit r/{subreddit}: {len(pending)} new posts from {pages} pages")
+    return pending
 
+def scrape_reddit_subreddit(subreddit="all", limit=20):
+    conn = get_db_connection()
+    try:
+        fetched = finish_posts(conn, collect_reddit_subreddit(subreddit, limit))
         logger.info(f"Finished scraping Reddit, fetched {fetched} posts.")
+        return fetched
     finally:
         conn.close()
 
-def scrape_arxiv():
+def collect_arxiv():
+    """Parse the cs.AI listing into pending posts (abstracts need no article fetch)"""
     logger.info("Scraping arXiv for AI papers...")
-    url = "https://arxiv.org/list/cs.AI/recent"
+    url = ARXIV_URL
     conn = get_db_connection()
     try:
-        res = requests.get(url, headers=HEADERS, timeout=15)
+        res = fetch_listing(url)
+        if res is None:
+            return []
         if res.status_code != 200:
             logger.error(f"Failed to fetch arXiv: {res.status_code}")
-            return
+            return []
             
-        # Discover sources from page content
-        discover_new_sources(url, res.text)
-            
-        soup = BeautifulSoup(res.text, "html.parser")
-        papers = soup.select("dt + dd")  # Get all dd elements following dt
+        # Parse once, then discover sources from page content
+        doc = HtmlDocument(res.text, url)
+        discover_new_sources(url, doc, conn)
+        return drop_existing(conn, parse_arxiv_listing(doc))
+    finally:
+        conn.close()
 
-        if not papers:
-            logger.warning("No papers found on arXiv page")
-            return
+def scrape_arxiv():
+    conn = get_db_connection()
+    try:
+        return finish_posts(conn, collect_arxiv())
+    finally:
+        conn.close()
 
-        for paper in papers[:10]:  # Limit to 10 papers
-            try:
-                # Get the preceding dt element which contains the ID and links
-                dt = paper.find_previous("dt")
-                if not dt:
-                    continue
+def collect_webpage(url, source_type):
+    """Scrape a generic listing page into pending posts for its article links"""
+    res = fetch_listing(url)
+    if res is None:
+        return []
+    if res.status_code != 200:
+        logger.warning(f"Failed to fetch {url}: {res.status_code}")
+        return []
+        
+    conn = get_db_connection()
+    try:
+        # Parse once, then discover sources from main page
+        doc = HtmlDocument(res.text, url)
+        discover_new_sources(url, doc, conn)
+        return drop_existing(conn, parse_webpage_listing(doc, source_type))
+    finally:
+        conn.close()
 
-                # Extract paper ID and URL
-                paper_link = dt.find("a", href=lambda x: x and "/abs/" in x)
-                if not paper_link:
-                    continue
+def collect_source(url, source_type):
+    """Collect pending posts from a specific source"""
+    if "ycombinator" in url:
+        return collect_hacker_news()
+    elif "reddit" in url:
+        subreddit = url.split("/")[-2] if "/" in url else "all"
+        return collect_reddit_subreddit(subreddit=subreddit)
+    elif "arxiv" in url:
+        return collect_arxiv()
+    # Generic webpage scraping
+    return collect_webpage(url, source_type)
 
-                paper_id = paper_link.get("id")
-                paper_url = f"https://arxiv.org{paper_link['href']}"
+def complete_post(post, article_text):
+    """Turn a pending post into a saveable one by appending its article text.
 
-                # Extract title
-                title_tag = paper.find("div", class_="list-title")
-                if not title_tag:
-                    continue
-                title = title_tag.text.replace("Title:", "").strip()
-
-                # Extract authors
-                authors_tag = paper.find("div", class_="list-authors")
-                authors = (
-                    authors_tag.text.replace("Authors:", "").strip()
-                    if authors_tag
-                    else "Unknown"
-                )
-
-                # Extract abstract - look in both meta and abstract div
-                abstract = ""
-                abstract_tag = paper.find("p", class_="mathjax")
-                if not abstract_tag:
-                    abstract_tag = paper.find("div", class_="abstract")
-                if abstract_tag:
-                    abstract = abstract_tag.text.replace("Abstract:", "").strip()
-
-                # Extract subjects/categories
-                subjects_tag = paper.find("div", class_="list-subjects")
-                subjects = (
-                    subjects_tag.text.replace("Subjects:", "").strip()
-                    if subjects_tag
-                    else ""
-                )
-
-                content = f"Title: {title}\n\nAuthors: {authors}\n\nSubjects: {subjects}\n\nAbstract: {abstract or 'No abstract available'}"
-
-                post = {
-                    "id": paper_id,
-                    "title": title,
-                    "url": paper_url,
-                    "content": content,
-                    "source": "arxiv",
-                    "created_at": datetime.datetime.utcnow(),
-                }
-
-                if not post_exists(conn, paper_id):
-                    save_post(conn, post)
-                    logger.info(f"Saved arXiv paper: {title[:60]}...")
-                else:
-                    logger.debug(f"Skipping existing paper: {title[:60]}...")
+    Content is cut at MAX_CONTENT_CHARS before it is stored.
+    """
+    post = dict(post)
+    post.pop("article_urls", None)
+    post.pop("discover_from", None)
+    parts = (post.get("content", ""), (article_text or "").strip())
+    post["content"] = "\n\n".join(part for part in parts if part)[:MAX_CONTENT_CHARS]
+    return post
 
-            except Exception as e:
-                logger.error(f"Error processing arXiv paper: {str(e)}")
+def save_finished_post(conn, writer, pending_post, article_text):
+    post = complete_post(pending_post, article_text)
+    writer.add(post)
+    logger.info(f"Saved {post['source']} post: {post['title'][:60]}...")
+
+    if pending_post.get("discover_from") and post["content"]:
+        discover_new_sources(pending_post["discover_from"], post["content"], conn)
+
+def finish_posts(conn, pending):
+    """Download article pages on this thread while the extraction pool parses them.
+
+    Up to two pages per worker are queued for parsing; each post is written
+    as soon as its text comes back, and an empty result moves on to the
+    post's next article URL.
+    """
+    pool = get_extraction_pool()
+    queued = list(reversed(pending))
+    in_flight = {}
+
+    def start(pending_post, article_urls):
+        # Submit the first downloadable URL; posts with none are saved without article text
+        for i, article_url in enumerate(article_urls):
+            html = download_article(article_url)
+            if html:
+                future = pool.submit(parse_article, article_url, html)
+                in_flight[future] = (pending_post, article_urls[i + 1:])
+                return
+        save_finished_post(conn, writer, pending_post, "")
+
+    with PostWriter(conn) as writer:
+        while queued or in_flight:
+            if queued and len(in_flight) < EXTRACTION_WORKERS * 2:
+                pending_post = queued.pop()
+                start(pending_post, pending_post.get("article_urls", []))
                 continue
-    finally:
-        conn.close()
+
+            # Wake up at least once per flush interval so a slow parse cannot hold back
+            # posts already buffered
+            done, _ = wait(in_flight, timeout=writer.flush_interval, return_when=FIRST_COMPLETED)
+            writer.flush_if_due()
+            for future in done:
+                pending_post, remaining_urls = in_flight.pop(future)
+                try:
+                    article_text = future.result()
+                except Exception as e:
+                    logger.error(f"Article extraction failed for {pending_post['url']}: {str(e)}")
+                    article_text = ""
+                if not article_text and remaining_urls:
+                    start(pending_post, remaining_urls)
+                else:
+                    save_finished_post(conn, writer, pending_post, article_text)
+    return len(pending)
 
 def scrape_source(url, source_type):
     """Scrape content from a specific source"""
     logger.info(f"Scraping source: {url}")
-    
-    if "ycombinator" in url:
-        scrape_hacker_news()
-    elif "reddit" in url:
-        subreddit = url.split("/")[-2] if "/" in url else "all"
-        scrape_reddit_subreddit(subreddit=subreddit)
-    elif "arxiv" in url:
-        scrape_arxiv()
-    else:
-        # Generic webpage scraping
-        try:
-            res = requests.get(url, headers=HEADERS, timeout=15)
-            if res.status_code != 200:
-                logger.warning(f"Failed to fetch {url}: {res.status_code}")
-                return
-                
-            # Discover sources from main page
-            discover_new_sources(url, res.text)
-            
-            soup = BeautifulSoup(res.text, "html.parser")
-            articles = soup.find_all("article") or soup.select(".post, .article, .entry")
-            
-            conn = get_db_connection()
-            try:
-                for article in articles[:10]:  # Limit to 10 articles per page
-                    title_elem = article.find(["h1", "h2", "h3"])
-                    link_elem = article.find("a", href=True)
-                    
-                    if not title_elem or not link_elem:
-                        continue
-                        
-                    title = title_elem.text.strip()
-                    link = link_elem["href"]
-                    
-                    if not link.startswith("http"):
-                        link = urljoin(url, link)
-                        
-                    post_id = hashlib.md5(link.encode()).hexdigest()
-                    
-                    if post_exists(conn, post_id):
-                        continue
-                        
-                    content = extract_article_text(link)
-                    
-                    post = {
-                        "id": post_id,
-                        "title": title,
-                        "url": link,
-                        "content": content,
-                        "source": source_type,
-                        "created_at": datetime.datetime.utcnow(),
-                    }
-                    
-                    save_post(conn, post)
-                    logger.info(f"Saved post: {title[:60]}...")
-                    
-                    # Discover new sources from content
-                    if content:
-                        discover_new_sources(url, content)
-            finally:
-                conn.close()
-        except Exception as e:
-            logger.error(f"Error scraping {url}: {str(e)}")
 
-def scrape_active_sources():
-    """Scrape all active sources using quality-based prioritization"""
-    logger.info("Scraping active sources with quality prioritization...")
+    conn = get_db_connection()
+    try:
+        return finish_posts(conn, collect_source(url, source_type))
+    except Exception as e:
+        logger.error(f"Error scraping {url}: {str(e)}")
+        return 0
+    finally:
+        conn.close()
+
+def select_sources(limit=SOURCES_PER_RUN):
+    """Pick this run's sources: the best unexplored frontier links, then the most overdue recrawls.
+
+    Followed links are first crawled when popped off the link_discovery
+    frontier; after that mark_crawled schedules them like any other source.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        # Get active sources ordered by quality and freshness
+        explore = link_frontier.pop_best(
+            conn, max(1, int(limit * FRONTIER_SHARE)), SOURCE_QUALITY_THRESHOLD
+        )
+
+        # Range scan on idx_discovered_sources_due; intervals already encode how
+        # often each source publishes
         cursor.execute("""
             SELECT url, source_type 
             FROM discovered_sources 
             WHERE is_active = 1
+            AND next_crawl_at <= ?
             AND quality_score >= ?
-            ORDER BY 
-                (quality_score * 0.7 + 
-                 (1 - (julianday('now') - julianday(discovered_at)) / 30) * 0.3) DESC,
-                last_crawled ASC NULLS FIRST
-            LIMIT 4  -- Optimal for hourly processing
-        """, (SOURCE_QUALITY_THRESHOLD,))
+            ORDER BY next_crawl_at
+            LIMIT ?
+        """, (datetime.datetime.utcnow().isoformat(), SOURCE_QUALITY_THRESHOLD,
+              limit - len(explore)))
         
-        sources = cursor.fetchall()
-        logger.info(f"Selected {len(sources)} sources for scraping")
+        sources = cursor.fetchall() + explore
+        logger.info(f"Selected {len(sources)} sources for scraping, "
+                    f"{len(explore)} from the link frontier")
     except Exception as e:
         logger.error(f"Source selection failed: {str(e)}")
         sources = []
     finally:
         conn.close()
-    
+    return sources
+
+def has_active_sources():
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM discovered_sources WHERE is_active = 1 LIMIT 1")
+        return cursor.fetchone() is not None
+    finally:
+        conn.close()
+
+def recrawl_schedule(freshness, changed, now):
+    """New freshness score and next crawl time after a visit.
+
+    freshness is a moving average of how often visits find something new;
+    the recrawl interval shrinks towards MIN_RECRAWL_HOURS as it approaches 1
+    and backs off towards MAX_RECRAWL_HOURS while visits keep coming up empty.
+    """
+    freshness = (1 - FRESHNESS_ALPHA) * freshness + FRESHNESS_ALPHA * (1.0 if changed else 0.0)
+    hours = min(MAX_RECRAWL_HOURS, MIN_RECRAWL_HOURS / max(freshness, 1e-6))
+    return freshness, now + datetime.timedelta(hours=hours)
+
+def mark_crawled(url, new_posts=0):
+    """Update crawl stats for a source and schedule its next visit from its change rate.
+
+    A visit counts as a change when it produced new posts or the listing's
+    body hash moved since the previous crawl.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        now = datetime.datetime.utcnow()
+        cursor.execute("""
+            SELECT d.freshness_score, d.last_crawled, h.changed_at
+            FROM discovered_sources d
+            LEFT JOIN http_cache h ON h.url = d.url
+            WHERE d.url = ?
+        """, (url,))
+        row = cursor.fetchone()
+        if row is None:
+            return
+        freshness, last_crawled, changed_at = row
+        changed = new_posts > 0 or bool(
+            changed_at and (last_crawled is None or changed_at > last_crawled)
+        )
+        freshness, next_crawl_at = recrawl_schedule(
+            freshness if freshness is not None else 1.0, changed, now
+        )
+
+        cursor.execute("""
+            UPDATE discovered_sources 
+            SET last_crawled = ?,
+                crawl_count = COALESCE(crawl_count, 0) + 1,
+                freshness_score = ?,
+                next_crawl_at = ?
+            WHERE url = ?
+        """, (now.isoformat(), freshness, next_crawl_at.isoformat(), url))
+        conn.commit()
+        logger.info(
+            f"Updated crawl info for {url}: freshness {freshness:.2f}, "
+            f"next crawl at {next_crawl_at:%Y-%m-%d %H:%M}"
+        )
+    except Exception as e:
+        logger.error(f"Failed to update crawl info: {str(e)}")
+    finally:
+        conn.close()
+
+def scrape_active_sources(concurrent=False):
+    """Scrape the active sources that are due, then reschedule each from what it yielded"""
+    logger.info("Scraping active sources due for a recrawl...")
+
+    if concurrent:
+        from crawl_engine import AsyncCrawlEngine
+
+        sources = select_sources(ASYNC_SOURCES_PER_RUN)
+        if not sources:
+            if has_active_sources():
+                logger.info("No sources due for a recrawl yet")
+                return
+            logger.warning("No active sources found - falling back to seed sources")
+            sources = FALLBACK_SOURCES
+        AsyncCrawlEngine().run(sources)
+        save_seen_urls()
+        return
+
+    sources = select_sources()
+    if not sources and has_active_sources():
+        logger.info("No sources due for a recrawl yet")
+        return
     if not sources:
         logger.warning("No active sources found - falling back to seed sources")
         # Scrape default sources
         scrape_hacker_news()
         scrape_reddit_subreddit("artificial")
         scrape_arxiv()
+        save_seen_urls()
         return
     
     for url, source_type in sources:
+        saved = 0
         try:
-            scrape_source(url, source_type)
+            saved = scrape_source(url, source_type)
         except Exception as e:
             logger.error(f"Scraping failed for {url}: {str(e)}")
         
-        # Update last_crawled timestamp
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                UPDATE discovered_sources 
-                SET last_crawled = ?,
-                    crawl_count = COALESCE(crawl_count, 0) + 1
-                WHERE url = ?
-            """, (datetime.datetime.utcnow().isoformat(), url))
-            conn.commit()
-            logger.info(f"Updated crawl info for {url}")
-        except Exception as e:
-            logger.error(f"Failed to update crawl info: {str(e)}")
-        finally:
-            conn.close()
-        
-        # Be polite between sources
-        time.sleep(random.uniform(1, 3))
+        mark_crawled(url, saved)
     
+    save_seen_urls()
     logger.info("Finished scraping active sources")
 
+def reextract_article(job):
+    """Rebuild one post's content from archived pages (runs in a worker process).
+
+    Returns None for the content when the post has article pages but none
+    of the archived ones parses to text, so the stored content is kept.
+    """
+    post, article_pages = job
+    if not post.get("article_urls"):
+        # Listing-only posts (arXiv) carry their whole content in the listing
+        return post["id"], complete_post(post, "")["content"]
+    for article_url, digest in article_pages:
+        try:
+            html = page_archive.load(digest)
+        except Exception as e:
+            # A missing blob or codec (zstd without zstandard) skips this page, not the run
+            logger.error(f"Cannot read archived page {digest} for {article_url}: {str(e)}")
+            continue
+        article_text = parse_article(article_url, html)
+        if article_text:
+            return post["id"], complete_post(post, article_text)["content"]
+    return post["id"], None
+
+def reextract_posts(workers=None):
+    """Rebuild posts.content from archived listings and articles without touching the network.
+
+    Archived listing pages are re-run through the current listing parsers,
+    newest archive first, and article pages through parse_article in a
+    process pool of EXTRACTION_WORKERS by default. Only posts that already
+    exist and have an archived article page that still parses (or need none)
+    are updated; a changed post is re-fingerprinted and queued for scoring
+    and embedding again.
+    """
+    conn = get_db_connection()
+    try:
+        pending_by_id = {}
+        for url, digest in page_archive.listings(conn):
+            try:
+                doc = HtmlDocument(page_archive.load(digest), url)
+            except Exception as e:
+                logger.error(f"Cannot read archived listing {digest} for {url}: {str(e)}")
+                continue
+            for post in parse_listing(url, "webpage", doc):
+                pending_by_id.setdefault(post["id"], post)
+
+        existing = existing_post_ids(conn, pending_by_id)
+        pending = [post for post_id, post in pending_by_id.items() if post_id in existing]
+        archived = page_archive.latest_hashes(
+            conn, [url for post in pending for url in post.get("article_urls", [])]
+        )
+        jobs = []
+        for post in pending:
+            article_pages = [
+                (url, archived[url]) for url in post.get("article_urls", []) if url in archived
+            ]
+            # Without an archived article page there is nothing better than what is stored
+            if article_pages or not post.get("article_urls"):
+                jobs.append((post, article_pages))
+        logger.info(f"Re-extracting {len(jobs)} posts from {len(archived)} archived articles")
+
+        updated = 0
+        now = datetime.datetime.utcnow().isoformat()
+        cursor = conn.cursor()
+        with ProcessPoolExecutor(max_workers=workers or EXTRACTION_WORKERS) as pool:
+            for post_id, content in pool.map(reextract_article, jobs, chunksize=16):
+                if not content:
+                    continue
+                # New text invalidates the score, the stored embedding and the fingerprint
+                cursor.execute("""
+                    UPDATE posts
+                    SET content = ?, last_updated = ?, value_score = NULL,
+                        embedding = NULL, embedding_model = NULL, embedding_hash = NULL
+                    WHERE id = ? AND content IS NOT ?
+                """, (content, now, post_id, content))
+                if cursor.rowcount:
+                    canonical_id = dedup.register_post(conn, post_id, content)
+                    cursor.execute(
+                        "UPDATE posts SET canonical_id = ? WHERE id = ?", (canonical_id, post_id)
+                    )
+                    updated += 1
+        conn.commit()
+        logger.info(f"Re-extraction changed the content of {updated} posts")
+        return updated
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl active sources")
+    parser.add_argument(
+        "--async", dest="concurrent", action="store_true",
+        help="crawl sources concurrently with the asyncio engine",
+    )
+    parser.add_argument(
+        "--archive", action="store_true",
+        help="keep compressed raw pages for later --reextract runs",
+    )
+    parser.add_argument(
+        "--reextract", action="store_true",
+        help="rebuild posts.content from the page archive instead of crawling",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="article extraction processes (default: EXTRACTION_WORKERS, one per core)",
+    )
+    fixtures = parser.add_mutually_exclusive_group()
+    fixtures.add_argument(
+        "--record", metavar="DIR",
+        help="save every HTTP and browser response into a fixture store",
+    )
+    fixtures.add_argument(
+        "--replay", metavar="DIR",
+        help="serve every HTTP and browser response from a fixture store, offline",
+    )
+    args = parser.parse_args()
+
+    # Must be configured before crawler is imported below so SESSION picks it up
+    if args.record:
+        http_fixtures.configure("record", args.record)
+    elif args.replay:
+        http_fixtures.configure("replay", args.replay)
+
+    # Go through the importable module so crawl_engine and worker processes share its settings
+    import crawler
+
+    if args.workers:
+        crawler.EXTRACTION_WORKERS = args.workers
+    if args.replay:
+        # Recorded responses need no politeness delays
+        crawler.RATE_LIMITER.enabled = False
+
+    if args.reextract:
+        crawler.reextract_posts(workers=args.workers)
+    else:
+        crawler.ARCHIVE_PAGES = crawler.ARCHIVE_PAGES or args.archive
+        # Run scraping of active sources
+        crawler.scrape_active_sources(concurrent=args.concurrent)
+
 if __name__ == "__main__":
-    # Run scraping of active sources
-    scrape_active_sources()
+    main()
@@ -9,6 +9,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Keyset order the scorer walks its backlog in; only unscored posts with content are
+# indexed. Kept here so the scorer can create it on databases initialized before it
+UNSCORED_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_posts_unscored_content ON posts(created_at, id)
+    WHERE value_score IS NULL AND content != ''
+"""
+
+
+def add_column_if_missing(cursor, table, column, definition):
+    """Add a column to an existing table created by an older schema"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        logger.info(f"Added column {table}.{column}")
+
 
 def initialize_database():
     """Initialize all database tables with proper schema if they don't exist"""
@@ -40,9 +55,12 @@ def initialize_database():
         value_score REAL,
         novelty_score REAL,
         interest_score REAL,
-        embedding BLOB,
+        embedding BLOB,          -- float16 vector, see embedding_store
+        embedding_model TEXT,    -- model/version tag the vector was made with
+        embedding_hash TEXT,     -- sha256 of the embedded text, for reuse
         is_high_value BOOLEAN DEFAULT 0,
         user_feedback TEXT,  -- 'positive', 'negative', or NULL
+        canonical_id TEXT,   -- set when this post is a near-duplicate of another
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         CHECK (is_high_value IN (0, 1))
@@ -50,6 +68,32 @@ def initialize_database():
     """
     )
 
+    add_column_if_missing(cursor, "posts", "canonical_id", "TEXT")
+    add_column_if_missing(cursor, "posts", "embedding_model", "TEXT")
+    add_column_if_missing(cursor, "posts", "embedding_hash", "TEXT")
+
+    # MinHash signatures for near-duplicate detection
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS post_fingerprints (
+        post_id TEXT PRIMARY KEY,
+        signature BLOB NOT NULL,   -- uint32 MinHash values
+        FOREIGN KEY(post_id) REFERENCES posts(id) ON DELETE CASCADE
+    )
+    """
+    )
+
+    # LSH band buckets pointing at fingerprinted posts
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS post_lsh (
+        band_key INTEGER NOT NULL,
+        post_id TEXT NOT NULL,
+        FOREIGN KEY(post_id) REFERENCES posts(id) ON DELETE CASCADE
+    )
+    """
+    )
+
     # Source discovery and tracking (updated with freshness tracking)
     cursor.execute(
         """
@@ -66,7 +110,9 @@ def initialize_database():
         crawl_count INTEGER DEFAULT 0,
         is_active BOOLEAN DEFAULT 1,
         discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        freshness_score REAL DEFAULT 1.0,  -- Track content freshness
+        freshness_score REAL DEFAULT 1.0,  -- Moving average of visits that found new content
+        next_crawl_at TIMESTAMP,           -- When the source is next due, from its change rate
+        merged_count INTEGER DEFAULT 1,    -- URLs compacted into this canonical source
         CHECK (is_active IN (0, 1))
     )
     """
@@ -160,6 +206,46 @@ def initialize_database():
     """
     )
 
+    # HTTP validators for listing pages, used for conditional re-fetches
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS http_cache (
+        url TEXT PRIMARY KEY,
+        etag TEXT,
+        last_modified TEXT,
+        body_hash TEXT,            -- sha256 of the last 200 response body
+        fetched_at TIMESTAMP,
+        changed_at TIMESTAMP       -- last time the body actually changed
+    )
+    """
+    )
+
+    # Compressed raw pages (content-addressed files under archive/) for re-extraction
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS page_archive (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        url TEXT NOT NULL,
+        content_hash TEXT NOT NULL,  -- sha256 of the page, names the archive file
+        kind TEXT NOT NULL,          -- 'listing' or 'article'
+        fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(url, content_hash)
+    )
+    """
+    )
+
+    # Per-listing ingestion cursors, so crawls stop once they reach known items
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS ingest_cursors (
+        source TEXT PRIMARY KEY,   -- 'hackernews', 'reddit:<subreddit>' or 'scorer:backlog'
+        high_water TEXT,           -- newest item id seen (HN id or Reddit fullname); scorer: created_at
+        after TEXT,                -- id to resume an unfinished backlog from
+        updated_at TIMESTAMP
+    )
+    """
+    )
+
     # Initialize interest profile weights from config
     from config import INTEREST_CONFIG
 
@@ -181,10 +267,10 @@ def initialize_database():
     seed_sources = [
         ("https://news.ycombinator.com/", "webpage", "seed"),
         ("https://arxiv.org/list/cs.AI/recent", "webpage", "seed"),
-        ("https://www.lesswrong.com/", "webpage", "seed"),
+        ("https://lesswrong.com/", "webpage", "seed"),
         ("https://marginalrevolution.com/", "webpage", "seed"),
         ("https://astralcodexten.substack.com/", "webpage", "seed"),
-        ("https://www.stratechery.com/", "webpage", "seed"),
+        ("https://stratechery.com/", "webpage", "seed"),
     ]
 
     for url, source_type, method in seed_sources:
@@ -197,6 +283,40 @@ def initialize_database():
             (url, source_type, method, 1.2, 1.0),
         )
 
+    # Followed links that were never crawled wait on the link_discovery frontier
+    # (scored by their inherited quality when no anchor text was kept)
+    add_column_if_missing(cursor, "discovered_sources", "next_crawl_at", "TIMESTAMP")
+    add_column_if_missing(cursor, "discovered_sources", "merged_count", "INTEGER DEFAULT 1")
+    cursor.execute(
+        """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_link_discovery_url ON link_discovery(discovered_url)
+    """
+    )
+    cursor.execute(
+        """
+    INSERT OR IGNORE INTO link_discovery (source_url, discovered_url, discovery_score)
+    SELECT COALESCE(parent_url, ''), url, quality_score
+    FROM discovered_sources
+    WHERE discovery_method = 'link_follow' AND last_crawled IS NULL
+    """
+    )
+    cursor.execute(
+        """
+    UPDATE discovered_sources SET next_crawl_at = NULL
+    WHERE discovery_method = 'link_follow' AND last_crawled IS NULL
+    """
+    )
+
+    # Every other source from an older schema (and the seeds above) is due right away
+    cursor.execute(
+        """
+    UPDATE discovered_sources
+    SET next_crawl_at = strftime('%Y-%m-%dT%H:%M:%f', COALESCE(last_crawled, discovered_at))
+    WHERE next_crawl_at IS NULL
+    AND NOT (discovery_method = 'link_follow' AND last_crawled IS NULL)
+    """
+    )
+
     # Create indexes for better performance
     cursor.execute(
         """
@@ -238,6 +358,45 @@ def initialize_database():
     CREATE INDEX IF NOT EXISTS idx_link_discovery_explored ON link_discovery(explored)
     """
     )
+    cursor.execute(
+        """
+    CREATE INDEX IF NOT EXISTS idx_posts_canonical ON posts(canonical_id)
+    """
+    )
+    cursor.execute(
+        """
+    CREATE INDEX IF NOT EXISTS idx_post_lsh_band_key ON post_lsh(band_key)
+    """
+    )
+    cursor.execute(
+        """
+    CREATE INDEX IF NOT EXISTS idx_post_lsh_post ON post_lsh(post_id)
+    """
+    )
+    cursor.execute(
+        """
+    CREATE INDEX IF NOT EXISTS idx_page_archive_kind_url ON page_archive(kind, url)
+    """
+    )
+    cursor.execute(
+        """
+    CREATE INDEX IF NOT EXISTS idx_discovered_sources_due ON discovered_sources(is_active, next_crawl_at)
+    """
+    )
+    cursor.execute(
+        """
+    CREATE INDEX IF NOT EXISTS idx_link_discovery_frontier ON link_discovery(explored, discovery_score)
+    """
+    )
+    cursor.execute(
+        """
+    CREATE INDEX IF NOT EXISTS idx_posts_embedding_hash ON posts(embedding_hash)
+    """
+    )
+    # Replaced by idx_posts_unscored_content, which also leaves out empty posts that
+    # are never scored and so would otherwise stay in the index forever
+    cursor.execute("DROP INDEX IF EXISTS idx_posts_unscored")
+    cursor.execute(UNSCORED_INDEX_SQL)
     # NEW: Index for discovered_sources freshness
     cursor.execute(
         """
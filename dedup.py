@@ -0,0 +1,105 @@
+# dedup.py
+import hashlib
+import logging
+import re
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+LSH_BANDS = 16          # 16 bands x 4 rows: stories with Jaccard >= 0.7 collide ~99% of the time
+SHINGLE_SIZE = 3
+DUPLICATE_JACCARD = 0.7  # Estimated shingle overlap above which posts are the same story
+MIN_WORDS = 20           # Too little text gives unstable signatures
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(42)
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, NUM_PERM).astype(np.uint64)
+_token_re = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercased alphanumeric tokens, ignoring punctuation and markup noise"""
+    return _token_re.findall((text or "").lower())
+
+
+def minhash(tokens):
+    """MinHash signature over word shingles"""
+    shingles = {
+        " ".join(tokens[i:i + SHINGLE_SIZE])
+        for i in range(max(len(tokens) - SHINGLE_SIZE + 1, 1))
+    }
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "big")
+            for s in shingles
+        ),
+        dtype=np.uint64,
+        count=len(shingles),
+    ) % _MERSENNE_PRIME
+    # One affine permutation per row, keeping products below 2**62
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_keys(signature):
+    """One lookup key per LSH band, mixing in the band number"""
+    rows = NUM_PERM // LSH_BANDS
+    keys = []
+    for band in range(LSH_BANDS):
+        chunk = signature[band * rows:(band + 1) * rows].tobytes()
+        digest = hashlib.blake2b(bytes([band]) + chunk, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+
+def jaccard(a, b):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.mean(a == b))
+
+
+def find_canonical(cursor, post_id, signature, keys):
+    """Id of the canonical post most similar to signature, if it is a duplicate"""
+    cursor.execute(f"""
+        SELECT DISTINCT f.post_id, f.signature, p.canonical_id
+        FROM post_lsh l
+        JOIN post_fingerprints f ON f.post_id = l.post_id
+        LEFT JOIN posts p ON p.id = f.post_id  -- batch-mates are not inserted yet
+        WHERE l.band_key IN ({",".join("?" * len(keys))})
+        AND f.post_id != ?
+    """, (*keys, post_id))
+
+    best = None
+    for candidate_id, stored, canonical_id in cursor.fetchall():
+        similarity = jaccard(signature, np.frombuffer(stored, dtype=np.uint32))
+        if similarity >= DUPLICATE_JACCARD and (best is None or similarity > best[0]):
+            best = (similarity, canonical_id or candidate_id)
+    return best[1] if best else None
+
+
+def register_post(conn, post_id, content):
+    """Index a post's signature and return the canonical post id it duplicates, if any"""
+    tokens = tokenize(content)
+    if len(tokens) < MIN_WORDS:
+        return None
+
+    signature = minhash(tokens)
+    keys = band_keys(signature)
+    cursor = conn.cursor()
+    canonical_id = find_canonical(cursor, post_id, signature, keys)
+
+    cursor.execute(
+        "INSERT OR REPLACE INTO post_fingerprints (post_id, signature) VALUES (?, ?)",
+        (post_id, signature.tobytes()),
+    )
+    cursor.execute("DELETE FROM post_lsh WHERE post_id = ?", (post_id,))
+    cursor.executemany(
+        "INSERT INTO post_lsh (band_key, post_id) VALUES (?, ?)",
+        [(key, post_id) for key in keys],
+    )
+
+    if canonical_id:
+        logger.info(f"Post {post_id} is a near-duplicate of {canonical_id}")
+    return canonical_id
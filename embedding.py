@@ -3,30 +3,50 @@ import sqlite3
 import numpy as np
 import faiss
 import json
-from sentence_transformers import SentenceTransformer
 from config import INTEREST_CONFIG
+from embedding_store import embed_posts, from_blob, model_tag
 
 DATABASE = "database.db"
-EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 INDEX_FILE = "faiss.index"
 ID_MAP_FILE = "id_map.json"
 
 
 class EmbeddingIndexer:
     def __init__(self):
-        self.model = SentenceTransformer(EMBEDDING_MODEL)
         self.conn = sqlite3.connect(DATABASE)
 
+    def embed_missing(self):
+        """Store vectors for summarized posts scored before embeddings were persisted"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT id, title, content FROM posts
+            WHERE summary IS NOT NULL
+            AND canonical_id IS NULL
+            AND (embedding IS NULL OR embedding_model IS NOT ?)
+        """,
+            (model_tag(),),
+        )
+        rows = cursor.fetchall()
+        if rows:
+            # Same text as the scorer embeds, so hashes and vectors line up
+            embed_posts(self.conn, rows)
+            self.conn.commit()
+
     def build_index(self):
-        """Build or update the FAISS index"""
+        """Rebuild the FAISS index from the post embeddings stored by the scorer"""
+        self.embed_missing()
         cursor = self.conn.cursor()
         cursor.execute(
             """
-            SELECT id, summary, value_score FROM posts 
+            SELECT id, embedding, value_score FROM posts 
             WHERE summary IS NOT NULL
+            AND canonical_id IS NULL
+            AND embedding_model = ?
             ORDER BY score DESC
-            LIMIT 1000  # Only index top content
-        """
+            LIMIT 1000  -- Only index top content
+        """,
+            (model_tag(),),
         )
         rows = cursor.fetchall()
 
@@ -34,28 +54,14 @@ class EmbeddingIndexer:
             print("No posts to index.")
             return
 
-        # Prepare embeddings
-        embeddings = []
-        ids = []
-        id_map = {}
-
-        for i, (post_id, summary, score) in enumerate(rows):
-            vec = self.model.encode(summary)
-            embeddings.append(vec)
-            ids.append(i)
-            id_map[i] = (post_id, score)  # Store both ID and score
-
-        dim = len(embeddings[0])
-
-        # Try to load existing index to update
-        try:
-            index = faiss.read_index(INDEX_FILE)
-            print("Loaded existing index to update.")
-        except:
-            index = faiss.IndexIDMap(faiss.IndexFlatL2(dim))
-            print("Created new index.")
+        # Stored vectors, no re-encoding
+        embeddings = np.vstack([from_blob(blob) for _, blob, _ in rows])
+        ids = np.arange(len(rows))
+        id_map = {i: (post_id, score) for i, (post_id, _, score) in enumerate(rows)}
 
-        index.add_with_ids(np.array(embeddings).astype("float32"), np.array(ids))
+        # Rebuilt from scratch each run so index ids always match id_map
+        index = faiss.IndexIDMap(faiss.IndexFlatL2(embeddings.shape[1]))
+        index.add_with_ids(embeddings, ids)
 
         # Save index and mappings
         faiss.write_index(index, INDEX_FILE)
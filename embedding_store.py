@@ -0,0 +1,248 @@
+# embedding_store.py
+import hashlib
+import logging
+import os
+import re
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_VERSION = 3  # Bump when the text fed to the model changes, to invalidate stored vectors
+EMBEDDING_DTYPE = np.float16  # Stored precision; cosine scores move by ~1e-3 at most
+ID_BATCH_SIZE = 500
+TEXT_CACHE_FILE = "interest_embeddings.npz"
+# "torch" (SentenceTransformer), "onnx" or "onnx-int8" (onnx_encoder). Kept in the
+# environment so the scorer and indexer subprocesses started by the scheduler agree.
+BACKEND_ENV = "EMBEDDING_BACKEND"
+BACKENDS = ("torch", "onnx", "onnx-int8")
+MAX_SEQ_TOKENS = 256  # Model's max_seq_length; the tokenizer truncates anything longer anyway
+CHARS_PER_TOKEN = 4   # Rough WordPiece average for English prose
+CHAR_BUDGET = MAX_SEQ_TOKENS * CHARS_PER_TOKEN
+SAMPLED_CHUNKS = 0    # Extra evenly spaced windows of a long document averaged with its lead; 0 embeds the lead only
+BOILERPLATE_MAX_CHARS = 80  # Only lines this short can be dropped as boilerplate
+BOILERPLATE_LINE = re.compile(
+    r"^(?:©|(?:share (?:this|on)|subscribe|sign (?:up|in)|log ?in|advertisement|"
+    r"(?:accept|we use) cookies|read more|related (?:posts|articles|stories)|follow us|"
+    r"all rights reserved|copyright|click here)\b)",
+    re.IGNORECASE,
+)
+
+_models = {}
+
+
+def backend():
+    name = os.environ.get(BACKEND_ENV, "torch")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {name}")
+    return name
+
+
+def model_tag(backend_name=None):
+    """Identifies which model and text preparation produced a stored vector.
+
+    The fp32 ONNX export computes the same vectors as torch and shares its
+    tag; int8 vectors differ slightly, so they are tagged and reused apart.
+    """
+    tag = f"{EMBEDDING_MODEL}/v{EMBEDDING_VERSION}"
+    return tag + "/int8" if (backend_name or backend()) == "onnx-int8" else tag
+
+
+def get_model(backend_name=None):
+    """Process-wide encoder for a backend (default: $EMBEDDING_BACKEND), loaded on first use.
+
+    Every backend has SentenceTransformer's encode(texts, batch_size=...,
+    normalize_embeddings=...) interface.
+    """
+    backend_name = backend_name or backend()
+    if backend_name not in _models:
+        if backend_name == "torch":
+            from sentence_transformers import SentenceTransformer
+
+            _models[backend_name] = SentenceTransformer(EMBEDDING_MODEL)
+        else:
+            from onnx_encoder import OnnxEncoder
+
+            _models[backend_name] = OnnxEncoder(
+                quantized=backend_name == "onnx-int8", max_seq_tokens=MAX_SEQ_TOKENS
+            )
+    return _models[backend_name]
+
+
+def strip_title(content, title):
+    """content without a leading line that only repeats the title.
+
+    HN and Reddit content starts with the title and arXiv content with
+    "Title: ...", which would otherwise be embedded twice.
+    """
+    first, _, rest = content.lstrip().partition("\n")
+    first = " ".join(first.split())
+    if title and first.endswith(title) and len(first) <= len(title) + len("Title: "):
+        return rest
+    return content
+
+
+def clean_text(text):
+    """Collapse whitespace and drop empty lines and short boilerplate lines"""
+    lines = []
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if line and not (len(line) < BOILERPLATE_MAX_CHARS and BOILERPLATE_LINE.search(line)):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def cut_to_budget(text, budget=CHAR_BUDGET):
+    """Cut text to about budget characters, on a word boundary where one is near"""
+    if len(text) <= budget:
+        return text
+    cut = text[:budget]
+    space = cut.rfind(" ")
+    return cut[:space] if space > budget * 0.9 else cut
+
+
+def prepare_chunks(title, content, sampled_chunks=SAMPLED_CHUNKS):
+    """Model-sized windows to embed a post from: title and lead, plus evenly spaced samples.
+
+    Only what fits the model's token budget (estimated from characters) is
+    passed on, so tokenizer work no longer grows with page size; without
+    sampling only the head of the page is cleaned at all. The boilerplate
+    filter only applies to the content, never to the title.
+    """
+    title = " ".join((title or "").split())
+    body = content or ""
+    if not sampled_chunks:
+        body = body[:CHAR_BUDGET * 4]
+    body = clean_text(strip_title(body, title))
+    lead = cut_to_budget("\n".join(part for part in (title, body) if part))
+    chunks = [lead]
+    if sampled_chunks:
+        rest = body[max(len(lead) - len(title) - 1, 0):]
+        if len(rest) > CHAR_BUDGET // 4:
+            step = len(rest) / sampled_chunks
+            for i in range(sampled_chunks):
+                chunk = cut_to_budget(rest[int(i * step):].lstrip())
+                if len(chunk) > CHAR_BUDGET // 4:
+                    chunks.append(chunk)
+    return chunks
+
+
+def mean_vector(vectors):
+    """Normalized mean of normalized chunk embeddings"""
+    vector = np.mean(np.asarray(vectors, dtype=np.float32), axis=0)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def text_hash(text):
+    return hashlib.sha256((text or "").encode("utf-8", errors="replace")).hexdigest()
+
+
+def to_blob(vector):
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def from_blob(blob):
+    return np.frombuffer(blob, dtype=EMBEDDING_DTYPE).astype(np.float32)
+
+
+def encode_cached(texts, path=TEXT_CACHE_FILE, model=None):
+    """Normalized embeddings of a fixed list of texts, cached on disk.
+
+    The cache is keyed by a hash of the model tag and every text, so any
+    edit to the texts or a model change re-encodes; otherwise no model is
+    loaded at all.
+    """
+    key = text_hash(model_tag() + "\0" + "\0".join(texts))
+    if os.path.exists(path):
+        try:
+            with np.load(path) as cache:
+                if str(cache["key"]) == key:
+                    return cache["embeddings"]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable embedding cache {path}: {str(e)}")
+
+    embeddings = np.asarray(
+        (model or get_model()).encode(texts, normalize_embeddings=True), dtype=np.float32
+    )
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, key=np.array(key), embeddings=embeddings)
+    os.replace(tmp_path, path)
+    logger.info(f"Encoded and cached {len(texts)} texts in {path}")
+    return embeddings
+
+
+def cached_vectors(conn, hashes):
+    """Stored vectors of the current model tag for the given content hashes"""
+    hashes = list(set(hashes))
+    cursor = conn.cursor()
+    vectors = {}
+    for i in range(0, len(hashes), ID_BATCH_SIZE):
+        batch = hashes[i:i + ID_BATCH_SIZE]
+        cursor.execute(
+            f"""
+            SELECT embedding_hash, embedding FROM posts
+            WHERE embedding_model = ? AND embedding IS NOT NULL
+            AND embedding_hash IN ({",".join("?" * len(batch))})
+        """,
+            [model_tag()] + batch,
+        )
+        vectors.update((digest, from_blob(blob)) for digest, blob in cursor.fetchall())
+    return vectors
+
+
+def embed_posts(conn, posts, model=None, batch_size=64):
+    """Normalized embedding matrix for (post_id, title, content) triples, stored on the posts.
+
+    Posts are cut down by prepare_chunks first. Inputs already embedded
+    under the current model tag (the same article crawled twice, or a
+    re-score) reuse their stored vector; only the rest go through the model,
+    in one batched encode. The caller commits.
+    """
+    chunk_lists = [prepare_chunks(title, content) for _, title, content in posts]
+    hashes = [text_hash("\n\n".join(chunks)) for chunks in chunk_lists]
+    vectors = cached_vectors(conn, hashes)
+
+    missing = {}
+    for chunks, digest in zip(chunk_lists, hashes):
+        if digest not in vectors:
+            missing.setdefault(digest, chunks)
+    if missing:
+        encoded = (model or get_model()).encode(
+            [chunk for chunks in missing.values() for chunk in chunks],
+            batch_size=batch_size,
+            normalize_embeddings=True,
+        )
+        start = 0
+        for digest, chunks in missing.items():
+            vectors[digest] = mean_vector(encoded[start:start + len(chunks)])
+            start += len(chunks)
+    logger.info(f"Embedded {len(missing)} texts, reused {len(posts) - len(missing)} stored vectors")
+
+    conn.cursor().executemany(
+        "UPDATE posts SET embedding = ?, embedding_model = ?, embedding_hash = ? WHERE id = ?",
+        [(to_blob(vectors[digest]), model_tag(), digest, post_id)
+         for (post_id, _, _), digest in zip(posts, hashes)],
+    )
+    if not posts:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.vstack([vectors[digest] for digest in hashes])
+
+
+def load_embeddings(conn, where="1 = 1", params=(), limit=None):
+    """(post ids, embedding matrix) for posts with a current-model vector matching a filter"""
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        SELECT id, embedding FROM posts
+        WHERE embedding_model = ? AND embedding IS NOT NULL AND ({where})
+        ORDER BY created_at DESC
+        {"LIMIT ?" if limit else ""}
+    """,
+        (model_tag(), *params, *((limit,) if limit else ())),
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    return [row[0] for row in rows], np.vstack([from_blob(row[1]) for row in rows])
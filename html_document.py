@@ -0,0 +1,169 @@
+# html_document.py
+import logging
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+NON_CONTENT_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.gif', '.pdf', '.zip', '.css', '.js']
+
+
+def available_backends():
+    """Parser backends importable in this environment, fastest first"""
+    backends = []
+    try:
+        import selectolax.lexbor  # noqa: F401
+        backends.append("selectolax")
+    except ImportError:
+        pass
+    try:
+        import lxml  # noqa: F401
+        backends.append("lxml")
+    except ImportError:
+        pass
+    backends.append("html.parser")
+    return backends
+
+
+def default_backend():
+    """lxml when installed, since it also backs the shared BeautifulSoup tree"""
+    return "lxml" if "lxml" in available_backends() else "html.parser"
+
+
+PARSER_BACKEND = default_backend()
+ANCHOR_CONTEXT_CHARS = 200  # Text kept around a link, split evenly before and after it
+ANCHOR_CONTEXT_SIBLINGS = 4  # Most neighbouring nodes read on each side of a link
+
+
+def soup_text(node):
+    """Text of a BeautifulSoup tag or string"""
+    return node.get_text(" ", strip=True) if hasattr(node, "get_text") else str(node).strip()
+
+
+def lexbor_text(node):
+    return node.text(separator=" ", strip=True)
+
+
+def sibling_texts(node, step, text_of, limit=ANCHOR_CONTEXT_CHARS // 2):
+    """Texts of the siblings walking away from node, nearest first, until about limit chars"""
+    texts = []
+    size = 0
+    sibling = step(node)
+    for _ in range(ANCHOR_CONTEXT_SIBLINGS):
+        if sibling is None or size >= limit:
+            break
+        text = text_of(sibling)
+        if text:
+            texts.append(text)
+            size += len(text)
+        sibling = step(sibling)
+    return texts
+
+
+def normalize_link(base_url, href):
+    """Absolute http(s) URL without fragment or query, or None for non-content links"""
+    # Resolve relative URLs AND absolute automicatically
+    absolute_url = urljoin(base_url, href)
+    # Filter out non-http links
+    if not absolute_url.startswith("http"):
+        return None
+    normalized_url = absolute_url.split('#')[0].split('?')[0]
+    # Filter out non-content links
+    if any(ext in normalized_url for ext in NON_CONTENT_EXTENSIONS):
+        return None
+    return normalized_url
+
+
+class HtmlDocument:
+    """An HTML page parsed once and shared by link discovery, listing and article extraction.
+
+    "lxml" and "html.parser" build a single BeautifulSoup tree used for
+    everything. "selectolax" answers links() and article_text() from its own
+    much faster tree; listing extractors that need .soup then get a lazily
+    built lxml-backed soup.
+    """
+
+    def __init__(self, html, url=None, backend=None):
+        self.html = html or ""
+        self.url = url
+        self.backend = backend or PARSER_BACKEND
+        self._soup = None
+        self._tree = None
+        self._links = None
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            builder = self.backend if self.backend != "selectolax" else default_backend()
+            self._soup = BeautifulSoup(self.html, builder)
+        return self._soup
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            from selectolax.lexbor import LexborHTMLParser
+
+            self._tree = LexborHTMLParser(self.html)
+        return self._tree
+
+    def hrefs(self):
+        if self.backend == "selectolax":
+            return [node.attributes.get("href") for node in self.tree.css("a[href]")]
+        return [a["href"] for a in self.soup.find_all("a", href=True)]
+
+    def links(self):
+        """Absolute, normalized http(s) links found in the page"""
+        if self._links is None:
+            links = set()
+            for href in self.hrefs():
+                link = normalize_link(self.url or "", href or "")
+                if link:
+                    links.add(link)
+            self._links = links
+        return self._links
+
+    def anchors(self, wanted=None):
+        """{link: (anchor text, nearby text)} for each normalized link, or only those in wanted.
+
+        The context is the text of the anchor's nearest siblings, about
+        ANCHOR_CONTEXT_CHARS around it, so links sharing a large container
+        do not each read the whole container.
+        """
+        if self.backend == "selectolax":
+            nodes = ((node, node.attributes.get("href")) for node in self.tree.css("a[href]"))
+            text_of, previous, following = lexbor_text, (lambda n: n.prev), (lambda n: n.next)
+        else:
+            nodes = ((a, a["href"]) for a in self.soup.find_all("a", href=True))
+            text_of = soup_text
+            previous, following = (lambda n: n.previous_sibling), (lambda n: n.next_sibling)
+
+        half = ANCHOR_CONTEXT_CHARS // 2
+        anchors = {}
+        for node, href in nodes:
+            link = normalize_link(self.url or "", href or "")
+            if not link or link in anchors or (wanted is not None and link not in wanted):
+                continue
+            anchor = text_of(node)
+            before = " ".join(reversed(sibling_texts(node, previous, text_of)))[-half:]
+            after = " ".join(sibling_texts(node, following, text_of))[:half]
+            anchors[link] = (anchor, " ".join(part for part in (before, anchor, after) if part))
+        return anchors
+
+    def article_text(self):
+        """Main text: the <article> element if present, else all paragraphs"""
+        if self.backend == "selectolax":
+            article = self.tree.css_first("article")
+            if article:
+                return article.text()
+            texts = (p.text() for p in self.tree.css("p"))
+            return "\n".join(text for text in texts if text)
+
+        # Try to find main content
+        article = self.soup.find("article")
+        if article:
+            return article.get_text()
+
+        # Fallback to paragraph collection
+        paragraphs = self.soup.find_all("p")
+        return "\n".join(p.get_text() for p in paragraphs if p.get_text())
@@ -0,0 +1,70 @@
+# http_cache.py
+import datetime
+import hashlib
+
+
+def body_hash(text):
+    """Stable fingerprint of a response body"""
+    return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+
+
+def conditional_headers(conn, url):
+    """If-None-Match / If-Modified-Since headers from the last fetch of url"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT etag, last_modified FROM http_cache WHERE url = ?", (url,))
+    row = cursor.fetchone()
+    headers = {}
+    if row:
+        etag, last_modified = row
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def record_body(conn, url, text, etag=None, last_modified=None):
+    """Store the hash and validators of a fetched body and return whether it changed"""
+    cursor = conn.cursor()
+    now = datetime.datetime.utcnow().isoformat()
+    new_hash = body_hash(text)
+    cursor.execute("SELECT body_hash, changed_at FROM http_cache WHERE url = ?", (url,))
+    row = cursor.fetchone()
+    changed = not row or row[0] != new_hash
+
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO http_cache
+        (url, etag, last_modified, body_hash, fetched_at, changed_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+        (url, etag, last_modified, new_hash, now, now if changed else row[1]),
+    )
+    conn.commit()
+    return changed
+
+
+def record_response(conn, url, res):
+    """Store validators for a response and return whether its body changed.
+
+    A 304, or a 200 whose body hashes the same as last time, counts as
+    unchanged. Error responses are not cached and count as changed so the
+    caller sees and handles them as before.
+    """
+    if res.status_code == 304:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE http_cache SET fetched_at = ? WHERE url = ?",
+            (datetime.datetime.utcnow().isoformat(), url),
+        )
+        conn.commit()
+        return False
+    if res.status_code != 200:
+        return True
+    return record_body(
+        conn,
+        url,
+        res.text,
+        etag=res.headers.get("ETag"),
+        last_modified=res.headers.get("Last-Modified"),
+    )
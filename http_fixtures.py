@@ -0,0 +1,149 @@
+# http_fixtures.py
+import hashlib
+import io
+import json
+import logging
+import os
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# "live" hits the network, "record" also saves every response, "replay" never leaves the store.
+# Kept in the environment so worker processes and re-imported modules agree.
+MODE_ENV = "CRAWLER_HTTP_MODE"
+DIR_ENV = "CRAWLER_FIXTURE_DIR"
+DEFAULT_FIXTURE_DIR = "fixtures"
+
+
+def mode():
+    return os.environ.get(MODE_ENV, "live")
+
+
+def fixture_dir():
+    return os.environ.get(DIR_ENV, DEFAULT_FIXTURE_DIR)
+
+
+def configure(new_mode, root=DEFAULT_FIXTURE_DIR):
+    if new_mode not in ("live", "record", "replay"):
+        raise ValueError(f"Unknown HTTP mode: {new_mode}")
+    os.environ[MODE_ENV] = new_mode
+    os.environ[DIR_ENV] = root
+
+
+class FixtureStore:
+    """Responses on disk keyed by method and URL: <key>.json metadata plus <key>.body"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def key(self, method, url):
+        return hashlib.sha256(f"{method.upper()} {url}".encode()).hexdigest()
+
+    def save(self, method, url, status, headers, body):
+        os.makedirs(self.root, exist_ok=True)
+        key = self.key(method, url)
+        # Bodies are stored decoded, so the original encoding headers no longer apply
+        headers = {
+            name: value for name, value in headers.items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        }
+        with open(os.path.join(self.root, key + ".body"), "wb") as f:
+            f.write(body)
+        with open(os.path.join(self.root, key + ".json"), "w") as f:
+            json.dump({"method": method, "url": url, "status": status, "headers": headers}, f)
+
+    def load(self, method, url):
+        key = self.key(method, url)
+        meta_path = os.path.join(self.root, key + ".json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        with open(os.path.join(self.root, key + ".body"), "rb") as f:
+            meta["body"] = f.read()
+        return meta
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter that passes requests through and saves each response"""
+
+    def __init__(self, store, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Reading .content keeps the body available to the caller afterwards
+        self.store.save(
+            request.method, request.url, response.status_code,
+            dict(response.headers), response.content,
+        )
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter that answers from the fixture store and never touches the network"""
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+
+    def send(self, request, **kwargs):
+        fixture = self.store.load(request.method, request.url)
+        if fixture is None:
+            raise requests.exceptions.ConnectionError(
+                f"No recorded fixture for {request.method} {request.url}", request=request
+            )
+        response = requests.Response()
+        response.status_code = fixture["status"]
+        response.headers = CaseInsensitiveDict(fixture["headers"])
+        # A real body stream, so streamed reads (iter_content, raw.read) work as they do live
+        response.raw = io.BytesIO(fixture["body"])
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def close(self):
+        pass
+
+
+def install(session):
+    """Mount the adapter for the configured mode on a requests session"""
+    current = mode()
+    if current == "live":
+        return session
+    store = FixtureStore(fixture_dir())
+    adapter = RecordingAdapter(store) if current == "record" else ReplayAdapter(store)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    logger.info(f"HTTP {current} mode using fixtures in {store.root}")
+    return session
+
+
+def playwright_route_handler():
+    """Context-level Playwright route handler for the configured mode, or None when live"""
+    current = mode()
+    if current == "live":
+        return None
+    store = FixtureStore(fixture_dir())
+
+    def record(route):
+        response = route.fetch()
+        store.save(
+            route.request.method, route.request.url, response.status,
+            response.headers, response.body(),
+        )
+        route.fulfill(response=response)
+
+    def replay(route):
+        fixture = store.load(route.request.method, route.request.url)
+        if fixture is None:
+            route.abort()
+            return
+        route.fulfill(status=fixture["status"], headers=fixture["headers"], body=fixture["body"])
+
+    return record if current == "record" else replay
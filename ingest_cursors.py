@@ -0,0 +1,42 @@
+# ingest_cursors.py
+import datetime
+
+
+def load_cursor(conn, source):
+    """(high_water, after) saved for a source, or (None, None) on the first crawl"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT high_water, after FROM ingest_cursors WHERE source = ?", (source,))
+    row = cursor.fetchone()
+    return row if row else (None, None)
+
+
+def save_cursor(conn, source, high_water, after=None):
+    """Remember the newest item id seen for a source and where an unfinished backlog resumes"""
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO ingest_cursors (source, high_water, after, updated_at)
+        VALUES (?, ?, ?, ?)
+    """,
+        (source, high_water, after, datetime.datetime.utcnow().isoformat()),
+    )
+    conn.commit()
+
+
+def clear_cursor(conn, source):
+    """Forget a source's cursor once its backlog is fully processed"""
+    conn.cursor().execute("DELETE FROM ingest_cursors WHERE source = ?", (source,))
+    conn.commit()
+
+
+def hn_item_number(item_id):
+    """HN item ids are increasing integers"""
+    return int(item_id) if item_id and str(item_id).isdigit() else 0
+
+
+def reddit_item_number(fullname):
+    """Reddit fullnames (t3_1abc2d) encode an increasing base36 id after the type prefix"""
+    try:
+        return int(fullname.split("_", 1)[1], 36)
+    except (AttributeError, IndexError, ValueError):
+        return 0
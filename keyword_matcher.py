@@ -0,0 +1,137 @@
+# keyword_matcher.py
+import re
+
+from config import INTEREST_CONFIG
+
+NOVELTY_KEYWORDS = ["new", "breakthrough", "first", "novel", "innovative", "revolutionary", "emerging"]
+QUALITY_INDICATORS = ["research", "study", "analysis", "framework", "methodology", "evidence", "data"]
+JUNK_INDICATORS = ["click", "viral", "trending", "hot", "must-see", "shocking", "you won't believe"]
+TECHNICAL_TERMS = ["algorithm", "api", "framework", "system", "analysis", "research"]
+CATEGORY_PREFIX = "category:"  # List name prefix for INTEREST_CONFIG category keywords
+SCAN_MAX_TERMS = 64  # Up to this many terms, one str.find per term beats the trie pattern
+
+_matcher = None
+
+
+def is_word_char(char):
+    """Python's \\w for a single character"""
+    return char.isalnum() or char == "_"
+
+
+def bounded_at(text, start, end):
+    """Whether text[start:end] is not glued to word characters on either side"""
+    return (start == 0 or not is_word_char(text[start - 1])) and (
+        end == len(text) or not is_word_char(text[end])
+    )
+
+
+def trie_pattern(terms):
+    """Regex source matching any of terms, factored into a character trie.
+
+    re tries alternatives one by one, so a flat "a|b|c" costs O(terms) at
+    every text position; sharing prefixes makes each position cost about one
+    branch per character instead, whatever the number of terms.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End of a term
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A term ends here; quantifiers are greedy, so longer terms still win
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Counts hits from several named term lists in one pass over a text.
+
+    Terms match case-insensitively on word boundaries, and overlapping terms
+    all count: "new" and "new york" both match "the new york times". A term
+    shared by several lists counts towards each of them.
+
+    Small term sets are found with one str.find per term. Larger ones use a
+    single compiled trie pattern in a lookahead to locate every position
+    where some term starts, then walk the trie from each of those positions
+    to collect every term ending there, so shorter terms are not hidden by
+    longer ones.
+    """
+
+    def __init__(self, term_lists, scan_max_terms=SCAN_MAX_TERMS):
+        self.names = list(term_lists)
+        self.lists_for = {}
+        for name, terms in term_lists.items():
+            for term in terms:
+                if term:
+                    self.lists_for.setdefault(term.lower(), set()).add(name)
+        self.scan = len(self.lists_for) <= scan_max_terms
+        self.trie = {}
+        for term in self.lists_for:
+            node = self.trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = term
+        self.starts = re.compile(rf"(?<!\w)(?=(?:{trie_pattern(self.lists_for)})(?!\w))")
+
+    def scan_matches(self, text):
+        found = set()
+        for term in self.lists_for:
+            if term not in text:  # Most terms are absent; skip them at substring-test speed
+                continue
+            start = text.find(term)
+            while start != -1:
+                if bounded_at(text, start, start + len(term)):
+                    found.add(term)
+                    break
+                start = text.find(term, start + 1)
+        return found
+
+    def trie_matches(self, text):
+        found = set()
+        for match in self.starts.finditer(text):
+            node = self.trie
+            for end in range(match.start(), len(text)):
+                node = node.get(text[end])
+                if node is None:
+                    break
+                if "" in node and bounded_at(text, match.start(), end + 1):
+                    found.add(node[""])
+        return found
+
+    def matches(self, text):
+        """Distinct terms (lowercased) found in text"""
+        text = (text or "").lower()
+        return self.scan_matches(text) if self.scan else self.trie_matches(text)
+
+    def counts(self, text):
+        """Number of distinct terms from each list found in text"""
+        counts = dict.fromkeys(self.names, 0)
+        for term in self.matches(text):
+            for name in self.lists_for[term]:
+                counts[name] += 1
+        return counts
+
+
+def get_matcher():
+    """Process-wide matcher over the scorer, feedback and interest category term lists"""
+    global _matcher
+    if _matcher is None:
+        term_lists = {
+            "novelty": NOVELTY_KEYWORDS,
+            "quality": QUALITY_INDICATORS,
+            "junk": JUNK_INDICATORS,
+            "technical": TECHNICAL_TERMS,
+        }
+        for category, config in INTEREST_CONFIG["categories"].items():
+            term_lists[CATEGORY_PREFIX + category] = config["keywords"]
+        _matcher = KeywordMatcher(term_lists)
+    return _matcher
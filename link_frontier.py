@@ -0,0 +1,84 @@
+# link_frontier.py
+import logging
+
+from config import INTEREST_CONFIG
+from keyword_matcher import get_matcher
+
+logger = logging.getLogger(__name__)
+
+ANCHOR_WEIGHT = 1.0   # A keyword in the link text itself
+CONTEXT_WEIGHT = 0.4  # A keyword only in the text around the link
+CONTEXT_CHARS = 200   # Surrounding text kept per link
+
+_keyword_weights = None
+
+
+def keyword_weights():
+    """Highest category weight of each interest keyword, lowercased"""
+    global _keyword_weights
+    if _keyword_weights is None:
+        weights = {}
+        for category in INTEREST_CONFIG["categories"].values():
+            for keyword in category["keywords"]:
+                weights[keyword.lower()] = max(weights.get(keyword.lower(), 0), category["weight"])
+        _keyword_weights = weights
+    return _keyword_weights
+
+
+def score_link(anchor, context, parent_quality):
+    """Cheap yield estimate for an unexplored link from its anchor text and context"""
+    matcher = get_matcher()
+    weights = keyword_weights()
+    in_anchor = {term for term in matcher.matches(anchor) if term in weights}
+    in_context = {term for term in matcher.matches(context) if term in weights} - in_anchor
+    relevance = (
+        sum(weights[keyword] for keyword in in_anchor) * ANCHOR_WEIGHT
+        + sum(weights[keyword] for keyword in in_context) * CONTEXT_WEIGHT
+    )
+    return parent_quality * (1 + relevance)
+
+
+def push_links(cursor, source_url, links, anchors, parent_quality):
+    """Score newly discovered links and queue them as unexplored frontier entries.
+
+    anchors maps each link to the (anchor text, context) pairs pointing at
+    it; the best-scoring pair decides its priority.
+    """
+    rows = []
+    for link in links:
+        score, context = max(
+            (score_link(anchor, context, parent_quality), context)
+            for anchor, context in anchors.get(link) or [("", "")]
+        )
+        rows.append((source_url, link, context[:CONTEXT_CHARS], score))
+    cursor.executemany("""
+        INSERT OR IGNORE INTO link_discovery
+        (source_url, discovered_url, context, discovery_score)
+        VALUES (?, ?, ?, ?)
+    """, rows)
+    return len(rows)
+
+
+def pop_best(conn, limit, min_quality=0.0):
+    """Mark the highest-scoring unexplored links explored and return them as (url, source_type)"""
+    if limit <= 0:
+        return []
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT l.id, l.discovered_url, d.source_type, l.discovery_score
+        FROM link_discovery l
+        JOIN discovered_sources d ON d.url = l.discovered_url
+        WHERE l.explored = 0
+        AND d.is_active = 1
+        AND d.quality_score >= ?
+        ORDER BY l.discovery_score DESC
+        LIMIT ?
+    """, (min_quality, limit))
+    rows = cursor.fetchall()
+    cursor.executemany(
+        "UPDATE link_discovery SET explored = 1 WHERE id = ?", [(row[0],) for row in rows]
+    )
+    conn.commit()
+    for _, url, _, score in rows:
+        logger.info(f"Exploring frontier link {url} (score {score:.2f})")
+    return [(url, source_type) for _, url, source_type, _ in rows]
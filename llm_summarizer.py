@@ -54,6 +54,7 @@ def summarize_high_value():
         WHERE summary IS NULL 
         AND is_high_value = 1
         AND content IS NOT NULL
+        AND canonical_id IS NULL
         ORDER BY value_score DESC
         LIMIT ?
     """,
@@ -0,0 +1,101 @@
+# onnx_encoder.py
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HF_MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+ONNX_DIR = "onnx_model"
+MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+ONNX_OPSET = 14
+
+
+def export_model(model_dir=ONNX_DIR):
+    """Export the transformer and its tokenizer to ONNX, plus a dynamically int8-quantized copy.
+
+    Needs torch and transformers (both come with sentence_transformers) and
+    only runs once; encoding afterwards needs just onnxruntime and tokenizers.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(model_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(HF_MODEL_ID)
+    tokenizer.save_pretrained(model_dir)
+    model = AutoModel.from_pretrained(HF_MODEL_ID).eval()
+
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    model_path = os.path.join(model_dir, MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in names),
+            model_path,
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in names + ["last_hidden_state"]},
+            opset_version=ONNX_OPSET,
+        )
+    quantize_dynamic(model_path, os.path.join(model_dir, INT8_MODEL_FILE), weight_type=QuantType.QInt8)
+    logger.info(f"Exported {HF_MODEL_ID} to {model_dir}")
+
+
+class OnnxEncoder:
+    """all-MiniLM-L6-v2 through onnxruntime on CPU, with SentenceTransformer's encode interface.
+
+    Mean pooling over the attention mask and L2 normalization match the
+    sentence-transformers pipeline of this model.
+    """
+
+    def __init__(self, quantized=False, max_seq_tokens=256, model_dir=ONNX_DIR):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, INT8_MODEL_FILE if quantized else MODEL_FILE)
+        if not os.path.exists(model_path):
+            export_model(model_dir)
+        self.session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_seq_tokens)
+        self.tokenizer.enable_padding()
+        logger.info(f"Loaded ONNX embedding model {model_path}")
+
+    def encode_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64),
+            "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {name: value for name, value in inputs.items()
+                                         if name in self.input_names})[0]
+        mask = inputs["attention_mask"][:, :, None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+    def encode(self, sentences, batch_size=32, normalize_embeddings=False, **kwargs):
+        """Embeddings for a string or a list of strings, as a float32 array"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # Batch texts of similar length together so little of each batch is padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        embeddings = np.zeros((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            vectors = self.encode_batch([texts[i] for i in batch])
+            if not embeddings.shape[1]:
+                embeddings = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+            embeddings[batch] = vectors
+
+        if normalize_embeddings:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
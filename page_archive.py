@@ -0,0 +1,110 @@
+# page_archive.py
+import datetime
+import hashlib
+import logging
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; fall back to zlib so archiving still works
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = "archive"
+ZSTD_LEVEL = 10
+
+
+def content_hash(html):
+    return hashlib.sha256(html.encode("utf-8", errors="replace")).hexdigest()
+
+
+def blob_path(digest, root=ARCHIVE_DIR):
+    """Content-addressed location of a page: archive/ab/abcdef....zst"""
+    ext = ".zst" if zstandard else ".zz"
+    return os.path.join(root, digest[:2], digest + ext)
+
+
+def write_blob(html, root=ARCHIVE_DIR):
+    """Compress a page into the store if it is not there yet and return its hash"""
+    digest = content_hash(html)
+    path = blob_path(digest, root)
+    if not os.path.exists(path):
+        data = html.encode("utf-8", errors="replace")
+        if zstandard:
+            data = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        else:
+            data = zlib.compress(data, 6)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return digest
+
+
+def load(digest, root=ARCHIVE_DIR):
+    """Decompressed page for a content hash, whichever codec stored it"""
+    base = os.path.join(root, digest[:2], digest)
+    if os.path.exists(base + ".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst archive entries")
+        with open(base + ".zst", "rb") as f:
+            return zstandard.ZstdDecompressor().decompress(f.read()).decode("utf-8")
+    with open(base + ".zz", "rb") as f:
+        return zlib.decompress(f.read()).decode("utf-8")
+
+
+def store(conn, url, html, kind="article"):
+    """Archive a fetched page ('listing' or 'article') and index it by URL.
+
+    Refetching content seen before moves its fetched_at forward, so a page
+    that went A -> B -> A reads back as A.
+    """
+    try:
+        digest = write_blob(html)
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT INTO page_archive (url, content_hash, kind, fetched_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(url, content_hash) DO UPDATE SET fetched_at = excluded.fetched_at
+        """,
+            (url, digest, kind, datetime.datetime.utcnow().isoformat()),
+        )
+        conn.commit()
+        return digest
+    except Exception as e:
+        logger.error(f"Failed to archive {url}: {str(e)}")
+        return None
+
+
+def latest_hashes(conn, urls):
+    """Most recent archived content hash for each of the given URLs"""
+    urls = list(set(urls))
+    hashes = {}
+    cursor = conn.cursor()
+    for i in range(0, len(urls), 500):
+        batch = urls[i:i + 500]
+        cursor.execute(
+            f"""
+            SELECT url, content_hash FROM page_archive
+            WHERE kind = 'article' AND url IN ({",".join("?" * len(batch))})
+            ORDER BY fetched_at
+        """,
+            batch,
+        )
+        hashes.update(cursor.fetchall())  # later rows overwrite earlier ones
+    return hashes
+
+
+def listings(conn):
+    """(url, content_hash) of every archived listing page, newest first"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT url, content_hash FROM page_archive
+        WHERE kind = 'listing'
+        ORDER BY fetched_at DESC
+    """)
+    return cursor.fetchall()
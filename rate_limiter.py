@@ -0,0 +1,94 @@
+# rate_limiter.py
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CRAWL_DELAY = 2.0  # Seconds between requests to the same host
+MAX_CRAWL_DELAY = 30.0     # Ignore robots.txt delays longer than this
+ROBOTS_TIMEOUT = 5
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations instead of blocking"""
+
+    def __init__(self, rate, capacity=1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take one token and return how long the caller must wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Going negative queues callers behind each other at the bucket's rate
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class HostRateLimiter:
+    """Per-host politeness: one token bucket per domain, seeded from robots.txt"""
+
+    def __init__(self, default_delay=DEFAULT_CRAWL_DELAY, user_agent="*", use_robots=True,
+                 session=None):
+        self.default_delay = default_delay
+        self.user_agent = user_agent
+        self.use_robots = use_robots
+        self.session = session or requests.Session()
+        self.enabled = True
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def robots_delay(self, scheme, host):
+        """Crawl-delay advertised by the host's robots.txt, if any"""
+        robots_url = f"{scheme}://{host}/robots.txt"
+        try:
+            res = self.session.get(
+                robots_url, headers={"User-Agent": self.user_agent}, timeout=ROBOTS_TIMEOUT
+            )
+            if res.status_code != 200:
+                return None
+            parser = RobotFileParser(robots_url)
+            parser.parse(res.text.splitlines())
+            delay = parser.crawl_delay(self.user_agent)
+            return float(delay) if delay is not None else None
+        except Exception as e:
+            logger.debug(f"Could not read {robots_url}: {str(e)}")
+            return None
+
+    def bucket_for(self, url):
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        with self.lock:
+            bucket = self.buckets.get(host)
+        if bucket:
+            return bucket
+
+        delay = self.default_delay
+        if self.use_robots and parsed.scheme in ("http", "https"):
+            robots_delay = self.robots_delay(parsed.scheme, host)
+            if robots_delay:
+                delay = min(max(delay, robots_delay), MAX_CRAWL_DELAY)
+                logger.info(f"Using robots.txt crawl-delay of {delay}s for {host}")
+
+        with self.lock:
+            # Another thread may have seeded the host while robots.txt was loading
+            return self.buckets.setdefault(host, TokenBucket(1.0 / delay))
+
+    def wait(self, url):
+        """Block until a request to url's host is allowed, returning seconds waited"""
+        if not self.enabled:
+            return 0.0
+        delay = self.bucket_for(url).reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
@@ -7,6 +7,7 @@ import signal
 import sys
 import logging
 from config import INTEREST_CONFIG
+from source_canonical import compact_sources
 
 # Configure logging
 logging.basicConfig(
@@ -61,6 +62,16 @@ class TaskScheduler:
                 AND value_score < 0.3
             """)
             deleted = cursor.rowcount
+
+            # Near-duplicates go with their canonical post, as do dedup index rows
+            cursor.execute("""
+                DELETE FROM posts
+                WHERE canonical_id IS NOT NULL
+                AND canonical_id NOT IN (SELECT id FROM posts)
+            """)
+            deleted += cursor.rowcount
+            cursor.execute("DELETE FROM post_fingerprints WHERE post_id NOT IN (SELECT id FROM posts)")
+            cursor.execute("DELETE FROM post_lsh WHERE post_id NOT IN (SELECT id FROM posts)")
             self.conn.commit()
             if deleted > 0:
                 logger.info(f"Cleaned up {deleted} low-value posts")
@@ -70,6 +81,22 @@ class TaskScheduler:
             self.conn.rollback()
             return False
 
+    def compact_source_table(self):
+        """Collapse discovered_sources onto canonical sites, subreddits and feeds, once a day"""
+        if not self.should_run_task("source_compaction", 1440):
+            return False
+        try:
+            removed = compact_sources(self.conn)
+            self.conn.commit()
+            self.update_last_run("source_compaction")
+            if removed > 0:
+                logger.info(f"Compacted away {removed} redundant source rows")
+            return True
+        except Exception as e:
+            logger.error(f"Source compaction failed: {e}")
+            self.conn.rollback()
+            return False
+
     def should_run_task(self, task_name, interval_minutes):
         cursor = self.conn.cursor()
         cursor.execute(
@@ -120,7 +147,7 @@ class TaskScheduler:
 
         # Run standard tasks with staggered intervals
         tasks = [
-            (["python", "crawler.py"], "crawler", 55),  # 5 min before pipeline
+            (["python", "crawler.py", "--async"], "crawler", 55),  # 5 min before pipeline
             (["python", "scorer.py"], "scorer", 58),     # 2 min after crawler
             (["python", "llm_summarizer.py"], "summarizer", 59)  # 1 min after scorer
         ]
@@ -146,6 +173,7 @@ class TaskScheduler:
                 if datetime.now().hour == 3:
                     self.clean_low_value_content()
                     self.rehabilitate_sources()
+                    self.compact_source_table()
                     self.run_task(
                         ["python", "embedding.py"], "embedding", 1440
                     )
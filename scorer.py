@@ -1,11 +1,16 @@
 # scorer.py
 import sqlite3
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
+from collections import namedtuple
 from datetime import datetime
+from types import MappingProxyType
 import json
 import re
 from config import INTEREST_CONFIG
+import embedding_store
+from keyword_matcher import get_matcher
+from ingest_cursors import load_cursor, save_cursor, clear_cursor
+from db_init import UNSCORED_INDEX_SQL
 import logging
 
 # Configure logging
@@ -15,19 +20,57 @@ logger = logging.getLogger(__name__)
 DATABASE = "database.db"
 VALUE_THRESHOLD = 0.75  # Increased threshold for high-quality content
 LEARNING_RATE = 0.15    # More responsive learning
-NOVELTY_KEYWORDS = ["new", "breakthrough", "first", "novel", "innovative", "revolutionary", "emerging"]
-QUALITY_INDICATORS = ["research", "study", "analysis", "framework", "methodology", "evidence", "data"]
-JUNK_INDICATORS = ["click", "viral", "trending", "hot", "must-see", "shocking", "you won't believe"]
 SOURCE_QUALITY_THRESHOLD = 0.65
+ENCODE_BATCH_SIZE = 64  # Posts per SentenceTransformer forward pass
+UNIQUENESS_WINDOW = 2000  # Recent scored posts a new post is compared against
+SCORE_CHUNK_SIZE = 500  # Posts embedded, scored and committed together
+BACKLOG_CURSOR = "scorer:backlog"  # ingest_cursors key holding the last scored (created_at, id)
+RECENT_YEAR_PATTERN = re.compile(r'202[3-9]|2024|2025')
+NUMBER_PATTERN = re.compile(r'\d+')
+LINK_PATTERN = re.compile(r'http[s]?://')
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]+')
+
+# Everything the per-post scoring path reads, loaded once per run and never mutated
+ScoringContext = namedtuple("ScoringContext", [
+    "source_quality",        # source -> penalty_score
+    "learning_adjustments",  # category -> learned adjustment
+    "topic_boosts",          # category -> boost factor
+    "source_weights",        # source -> authority weight
+    "keywords",              # shared KeywordMatcher over every term list
+])
+
+def match_interests(content_embeddings, interest_embeddings, weights):
+    """Best weighted interest category per post: (category indices, interest scores).
+
+    Both embedding matrices are L2-normalized, so one matrix product gives
+    every post-category cosine similarity at once.
+    """
+    weighted = (content_embeddings @ interest_embeddings.T) * np.asarray(weights)
+    best = weighted.argmax(axis=1)
+    return best, weighted[np.arange(len(best)), best]
+
+def uniqueness_scores(content_embeddings, recent_embeddings):
+    """1 - highest cosine similarity of each post to the recently scored ones"""
+    if not len(recent_embeddings):
+        return np.ones(len(content_embeddings))
+    nearest = (content_embeddings @ recent_embeddings.T).max(axis=1)
+    return np.clip(1.0 - nearest, 0.0, 1.0)
 
 class ValueScorer:
     def __init__(self):
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
         self.conn = sqlite3.connect(DATABASE)
+        # get_unscored_posts names this index, which is an error if it does not exist
+        self.conn.execute(UNSCORED_INDEX_SQL)
         self.categories = INTEREST_CONFIG["categories"]
         self.source_weights = INTEREST_CONFIG["source_weights"]
         self.category_keys = list(self.categories.keys())
         self.learning_adjustments = self.load_learning_adjustments()
+        self.context = None
+
+    @property
+    def model(self):
+        """Shared embedding model, only loaded if something actually needs encoding"""
+        return embedding_store.get_model()
 
     def load_learning_adjustments(self):
         """Load learning adjustments from user feedback"""
@@ -48,36 +91,58 @@ class ValueScorer:
         
         return adjustments
 
+    def build_scoring_context(self):
+        """Snapshot the lookups the per-post path needs, so scoring a post touches no SQL"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT source, penalty_score FROM source_penalties")
+        source_quality = dict(cursor.fetchall())
+        
+        return ScoringContext(
+            source_quality=MappingProxyType(source_quality),
+            learning_adjustments=MappingProxyType({
+                category: data['adjustment']
+                for category, data in self.learning_adjustments.items()
+            }),
+            topic_boosts=MappingProxyType({
+                category: config.get('boost', 1.0)
+                for category, config in self.categories.items()
+            }),
+            source_weights=MappingProxyType(dict(self.source_weights)),
+            keywords=get_matcher(),
+        )
+
     def extract_content_features(self, content, title, source):
         """Extract features that indicate content value"""
         if not content:
             return {}
         
+        context = self.context
         text = (title + " " + content).lower()
         words = text.split()
+        keyword_counts = context.keywords.counts(text)
         
         features = {
             'word_count': len(words),
             'title_length': len(title.split()) if title else 0,
-            'has_numbers': bool(re.search(r'\d+', text)),
-            'has_technical_terms': sum(1 for term in QUALITY_INDICATORS if term in text),
-            'novelty_indicators': sum(1 for term in NOVELTY_KEYWORDS if term in text),
-            'junk_indicators': sum(1 for term in JUNK_INDICATORS if term in text),
-            'has_links': bool(re.search(r'http[s]?://', content or '')),
-            'source_authority': self.source_weights.get(source, 1.0),
-            'readability_score': self.calculate_readability(text),
+            'has_numbers': bool(NUMBER_PATTERN.search(text)),
+            'has_technical_terms': keyword_counts['quality'],
+            'novelty_indicators': keyword_counts['novelty'],
+            'junk_indicators': keyword_counts['junk'],
+            'has_links': bool(LINK_PATTERN.search(content or '')),
+            'source_authority': context.source_weights.get(source, 1.0),
+            'readability_score': self.calculate_readability(text, words),
             'content_depth': min(len(words) / 100, 5.0),  # Normalized depth score
         }
         
         return features
 
-    def calculate_readability(self, text):
+    def calculate_readability(self, text, words=None):
         """Simple readability score based on sentence and word length"""
         if not text:
             return 0.0
         
-        sentences = re.split(r'[.!?]+', text)
-        words = text.split()
+        sentences = SENTENCE_SPLIT_PATTERN.split(text)
+        words = words if words is not None else text.split()
         
         if len(sentences) == 0 or len(words) == 0:
             return 0.0
@@ -121,7 +186,7 @@ class ValueScorer:
         value_score *= features['source_authority']
         
         # Apply learning adjustments
-        learning_adj = self.learning_adjustments.get(features.get('topic', ''), {}).get('adjustment', 0)
+        learning_adj = self.context.learning_adjustments.get(features.get('topic', ''), 0)
         value_score += learning_adj
 
         # Add source quality factor
@@ -129,27 +194,21 @@ class ValueScorer:
         value_score *= source_quality
         
         # Add topic-specific adjustments
-        topic_boost = self.categories.get(features.get('topic', ''), {}).get('boost', 1.0)
+        topic_boost = self.context.topic_boosts.get(features.get('topic', ''), 1.0)
         value_score *= topic_boost
         
         return max(0.0, min(1.0, value_score))
 
     def get_source_quality(self, source):
         """Get current quality rating for a source"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT penalty_score FROM source_penalties WHERE source = ?",
-            (source,)
-        )
-        result = cursor.fetchone()
-        return result[0] if result else 1.0
+        return self.context.source_quality.get(source, 1.0)
         
     def calculate_novelty_score(self, features, content):
         """Calculate novelty score"""
         novelty_score = 0.0
         
         # Recent date mentions
-        if re.search(r'202[3-9]|2024|2025', content or ''):
+        if RECENT_YEAR_PATTERN.search(content or ''):
             novelty_score += 0.2
         
         # Novelty keywords
@@ -161,18 +220,17 @@ class ValueScorer:
         return max(0.0, min(1.0, novelty_score))
 
     def load_interest_embeddings(self):
-        """Load interest embeddings with learning adjustments"""
+        """Load interest embeddings (cached on disk per config and model) with learning adjustments"""
         interest_texts = []
         self.weights = []
 
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT category, current_weight FROM interest_profile")
+        current_weights = dict(cursor.fetchall())
+
         for cat, config in self.categories.items():
-            cursor = self.conn.cursor()
-            cursor.execute(
-                "SELECT current_weight FROM interest_profile WHERE category = ?",
-                (cat,)
-            )
-            row = cursor.fetchone()
-            base_weight = float(row[0]) if row else float(config["weight"])
+            row_weight = current_weights.get(cat)
+            base_weight = float(row_weight) if row_weight is not None else float(config["weight"])
             
             # Apply learning adjustments
             learning_data = self.learning_adjustments.get(cat, {})
@@ -181,19 +239,26 @@ class ValueScorer:
             interest_texts.append(config["name"] + ": " + ", ".join(config["keywords"]))
             self.weights.append(adjusted_weight)
 
-        embeddings = self.model.encode(interest_texts, normalize_embeddings=True)
-        return embeddings
+        return embedding_store.encode_cached(interest_texts)
+
+    def get_unscored_posts(self, after=None, limit=SCORE_CHUNK_SIZE):
+        """Next chunk of posts that need scoring, newest first.
 
-    def get_unscored_posts(self):
-        """Get posts that need scoring"""
+        after is the (created_at, id) of the last post already handled;
+        keyset pagination keeps each chunk an index range scan however deep
+        into the backlog it is.
+        """
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT id, title, content, source 
-            FROM posts 
+        cursor.execute(f"""
+            SELECT id, title, content, source, created_at
+            FROM posts INDEXED BY idx_posts_unscored_content  -- without ANALYZE stats sqlite sorts the whole backlog
             WHERE value_score IS NULL AND content IS NOT NULL
-            ORDER BY created_at DESC
-            LIMIT 100
-        """)
+            AND content != ''  -- failed article fetches; they have nothing to score
+            AND canonical_id IS NULL  -- near-duplicates are scored via their canonical post
+            {"AND (created_at, id) < (?, ?)" if after else ""}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        """, (*(after or ()), limit))
         return cursor.fetchall()
 
     def apply_learning_from_feedback(self):
@@ -364,25 +429,66 @@ class ValueScorer:
             self.conn.rollback()
             raise
 
-    def score_posts(self):
-        """Score all unscored posts"""
-        posts = self.get_unscored_posts()
-        if not posts:
+    def score_posts(self, chunk_size=SCORE_CHUNK_SIZE):
+        """Score every unscored post, one committed chunk at a time.
+
+        The (created_at, id) of each chunk's last post is saved with the
+        chunk, so an interrupted run resumes where it stopped; the checkpoint
+        is cleared once the backlog is drained. Only one chunk is in memory
+        at a time.
+        """
+        created_at, post_id = load_cursor(self.conn, BACKLOG_CURSOR)
+        resume = (created_at, post_id) if post_id else None
+        posts = self.get_unscored_posts(resume, chunk_size)
+        if not posts and resume is None:
             logger.info("No unscored posts found")
             return
         
+        self.context = self.build_scoring_context()
         interest_embeddings = self.load_interest_embeddings()
+        _, recent_embeddings = embedding_store.load_embeddings(
+            self.conn, "value_score IS NOT NULL", limit=UNIQUENESS_WINDOW
+        )
         
-        for post in posts:
-            post_id, title, content, source = post
+        if resume:
+            logger.info(f"Resuming backlog scoring after post {post_id}")
+        total = 0
+        # A resumed walk is followed by one from the top, for posts that arrived meanwhile
+        for walk, after in enumerate([resume, None] if resume else [None]):
+            if walk:
+                posts = self.get_unscored_posts(after, chunk_size)
+            while posts:
+                self.score_chunk(posts, interest_embeddings, recent_embeddings)
+                after = (posts[-1][4], posts[-1][0])
+                save_cursor(self.conn, BACKLOG_CURSOR, *after)  # Commits the chunk with it
+                total += len(posts)
+                logger.info(f"Scored {total} posts so far")
+                posts = self.get_unscored_posts(after, chunk_size)
+        clear_cursor(self.conn, BACKLOG_CURSOR)
+        logger.info(f"Scored {total} posts")
+
+    def score_chunk(self, posts, interest_embeddings, recent_embeddings):
+        """Score one chunk of posts and write the results; the caller commits"""
+        # Embed (or reuse stored vectors for) every post in batched forward passes,
+        # then match all of them at once
+        content_embeddings = embedding_store.embed_posts(
+            self.conn,
+            [(post_id, title, content) for post_id, title, content, _, _ in posts],
+            batch_size=ENCODE_BATCH_SIZE,
+        )
+        best_indices, interest_scores = match_interests(
+            content_embeddings, interest_embeddings, self.weights
+        )
+        uniqueness = uniqueness_scores(content_embeddings, recent_embeddings)
+        
+        post_updates = []
+        feature_rows = []
+        for post, best_index, interest_score, uniqueness_score in zip(
+            posts, best_indices, interest_scores, uniqueness
+        ):
+            post_id, title, content, source, _ = post
             features = self.extract_content_features(content, title, source)
-            
-            # Calculate interest score and determine topic
-            content_embedding = self.model.encode(content or title, normalize_embeddings=True)
-            similarities = util.cos_sim(content_embedding, interest_embeddings)[0].numpy()
-            weighted_similarities = similarities * self.weights
-            best_index = np.argmax(weighted_similarities)
-            interest_score = weighted_similarities[best_index]
+            interest_score = float(interest_score)
             topic = self.category_keys[best_index]
             
             # Calculate value and novelty scores
@@ -392,36 +498,38 @@ class ValueScorer:
             # Mark as high value if above threshold
             is_high_value = 1 if value_score >= VALUE_THRESHOLD else 0
             
-            # Update post with scores AND TOPIC
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                UPDATE posts
-                SET value_score = ?,
-                    novelty_score = ?,
-                    interest_score = ?,
-                    is_high_value = ?,
-                    topic = ? 
-                WHERE id = ?
-            """, (value_score, novelty_score, interest_score, is_high_value, topic, post_id))
-            
-            # Store content features
-            cursor.execute("""
-                INSERT OR REPLACE INTO content_features 
-                (post_id, word_count, readability_score, technical_terms_count, 
-                 source_authority, content_depth, uniqueness_score)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+            post_updates.append(
+                (value_score, novelty_score, interest_score, is_high_value, topic, post_id)
+            )
+            feature_rows.append((
                 post_id,
                 features.get('word_count', 0),
                 features.get('readability_score', 0),
                 features.get('has_technical_terms', 0),
                 features.get('source_authority', 1.0),
                 features.get('content_depth', 0),
-                0.0  # Placeholder for uniqueness_score
+                float(uniqueness_score),
             ))
         
-        self.conn.commit()
-        logger.info(f"Scored {len(posts)} posts")
+        # Update posts with scores AND TOPIC
+        cursor = self.conn.cursor()
+        cursor.executemany("""
+            UPDATE posts
+            SET value_score = ?,
+                novelty_score = ?,
+                interest_score = ?,
+                is_high_value = ?,
+                topic = ? 
+            WHERE id = ?
+        """, post_updates)
+        
+        # Store content features
+        cursor.executemany("""
+            INSERT OR REPLACE INTO content_features 
+            (post_id, word_count, readability_score, technical_terms_count, 
+             source_authority, content_depth, uniqueness_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, feature_rows)
 
     def run(self):
         logger.info("Starting scoring process")
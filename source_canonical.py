@@ -0,0 +1,157 @@
+# source_canonical.py
+import logging
+import re
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Hosts the crawler reads through one fixed listing whatever URL points at them
+SITE_SOURCES = {
+    "news.ycombinator.com": "https://news.ycombinator.com/",
+    "arxiv.org": "https://arxiv.org/list/cs.AI/recent",
+}
+FEED_PATH = re.compile(r"/(feed|rss|atom)(\.xml)?/?$|\.(rss|atom|xml)$", re.IGNORECASE)
+SUBREDDIT_PATH = re.compile(r"^/r/([A-Za-z0-9_]+)")
+MEDIUM_AUTHOR_PATH = re.compile(r"^/(@[^/]+)")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_source(url):
+    """The crawlable source a link belongs to, or None if it is not one.
+
+    Case, default ports, "www." and trailing slashes are normalized away and
+    article, tracking and pagination URLs collapse to their site root, a
+    subreddit, a Medium author or a feed. The scheme and any non-default port
+    are kept, since a site served only over http or on its own port cannot be
+    crawled at https://host/; compact_sources prefers https where both occur.
+    """
+    try:
+        parsed = urlparse(url.strip())
+        host = (parsed.hostname or "").lower()
+        port = parsed.port
+    except ValueError:
+        return None
+    scheme = parsed.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not host:
+        return None
+    if host.startswith("www."):
+        host = host[4:]
+    path = parsed.path
+
+    for site, source in SITE_SOURCES.items():
+        if host == site or host.endswith("." + site):
+            return source
+    if host == "reddit.com" or host.endswith(".reddit.com"):
+        match = SUBREDDIT_PATH.match(path)
+        return f"https://old.reddit.com/r/{match.group(1).lower()}/" if match else None
+    if host == "medium.com":
+        match = MEDIUM_AUTHOR_PATH.match(path)
+        if match:
+            return f"https://medium.com/{match.group(1).lower()}/"
+    origin = f"{scheme}://{host}" if port in (None, DEFAULT_PORTS[scheme]) else f"{scheme}://{host}:{port}"
+    if FEED_PATH.search(path):
+        return origin + path.rstrip("/")
+    return origin + "/"
+
+
+def preferred_scheme(sources):
+    """Each source mapped to its https spelling where any of sources uses https, else itself"""
+    secure = {source.split("://", 1)[1] for source in sources if source.startswith("https://")}
+    return {
+        source: "https://" + source.split("://", 1)[1] if source.split("://", 1)[1] in secure else source
+        for source in sources
+    }
+
+
+def merge_rows(source, rows):
+    """One discovered_sources row's values aggregating every row that shares a canonical source"""
+    keep = min(rows, key=lambda row: row["id"])
+    scheduled = [row["next_crawl_at"] for row in rows if row["next_crawl_at"]]
+    crawled = [row["last_crawled"] for row in rows if row["last_crawled"]]
+    return (
+        source,
+        keep["source_type"],
+        max(row["quality_score"] or 0.0 for row in rows),
+        min(row["estimated_quality"] for row in rows),
+        max(crawled) if crawled else None,
+        sum(row["crawl_count"] or 0 for row in rows),
+        max(row["is_active"] for row in rows),
+        min(str(row["discovered_at"]) for row in rows),
+        max(row["freshness_score"] or 0.0 for row in rows),
+        min(scheduled) if scheduled else None,
+        sum(row["merged_count"] or 1 for row in rows),
+        keep["id"],
+    )
+
+
+def compact_sources(conn):
+    """Merge discovered_sources rows onto their canonical source URL.
+
+    One row per canonical source survives, carrying the group's summed crawl
+    counts and merged_count, best quality and freshness, earliest discovery
+    and soonest recrawl. http and https spellings of a source merge onto
+    https; sources only ever seen over http stay on http. Rows that are not crawlable sources are deleted and
+    frontier entries move to the surviving URL. Returns the number of rows
+    removed; the caller commits.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, url, source_type, quality_score, estimated_quality, last_crawled,
+               crawl_count, is_active, discovered_at, freshness_score, next_crawl_at,
+               merged_count
+        FROM discovered_sources
+    """)
+    columns = [description[0] for description in cursor.description]
+    sources = {}
+    dropped = []
+    for values in cursor.fetchall():
+        row = dict(zip(columns, values))
+        source = canonical_source(row["url"])
+        if source is None:
+            dropped.append(row["id"])
+        else:
+            sources.setdefault(source, []).append(row)
+
+    groups = {}
+    for source, preferred in preferred_scheme(sources).items():
+        groups.setdefault(preferred, []).extend(sources[source])
+
+    merged = []
+    removed = []
+    moved = []
+    for source, rows in groups.items():
+        if len(rows) == 1 and rows[0]["url"] == source:
+            continue
+        merged.append(merge_rows(source, rows))
+        keep_id = min(row["id"] for row in rows)
+        removed += [row["id"] for row in rows if row["id"] != keep_id]
+        moved += [(source, row["url"]) for row in rows if row["url"] != source]
+
+    cursor.executemany(
+        "DELETE FROM discovered_sources WHERE id = ?", [(row_id,) for row_id in dropped + removed]
+    )
+    cursor.executemany("""
+        UPDATE discovered_sources
+        SET url = ?, source_type = ?, quality_score = ?, estimated_quality = ?,
+            last_crawled = ?, crawl_count = ?, is_active = ?, discovered_at = ?,
+            freshness_score = ?, next_crawl_at = ?, merged_count = ?
+        WHERE id = ?
+    """, merged)
+
+    # A canonical URL keeps at most one frontier entry, and none once it is being recrawled
+    cursor.executemany(
+        "UPDATE OR IGNORE link_discovery SET discovered_url = ? WHERE discovered_url = ?", moved
+    )
+    cursor.execute("""
+        DELETE FROM link_discovery
+        WHERE discovered_url NOT IN (SELECT url FROM discovered_sources)
+        OR (explored = 0 AND discovered_url IN (
+            SELECT url FROM discovered_sources WHERE last_crawled IS NOT NULL
+        ))
+    """)
+
+    logger.info(
+        f"Compacted discovered_sources: merged {len(removed)} rows into {len(merged)} "
+        f"sources, dropped {len(dropped)} non-source URLs, {len(groups)} sources remain"
+    )
+    return len(dropped) + len(removed)